@@ -3,15 +3,23 @@
 import os
 import sys
 import json
+import gzip
 import time
 import logging
 import requests
+from urllib.parse import urljoin
 from datetime import datetime, timedelta
-import oss2
-import openai
 
 # 添加当前目录到Python路径，确保可以导入GenerateWx目录下的config.py
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# 添加项目根目录到Python路径末尾，以便复用根目录下的公共模块（不覆盖本目录的config.py）
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_client import get_openai_client
+from github_client import get_github_client
+from http_cache import get_http_cache
+from storage import ObjectNotFound, create_storage
+from manifest import Manifest, MANIFEST_FILENAME
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -47,6 +55,32 @@ except Exception as e:
     AI_BASE_URL = os.environ.get('AI_BASE_URL', "https://api.openai.com/v1")
     AI_MODEL = os.environ.get('AI_MODEL', "gpt-3.5-turbo")
 
+# ================= GitHub 配置读取 =================
+# GitHub Token 用于README API请求，HTTP缓存目录与main.py一致时可直接复用抓取阶段缓存的README
+GH_TOKEN = ""
+HTTP_CACHE_DIR = ".http_cache"
+HTTP_CACHE_MAX_MB = 200
+
+try:
+    import config
+    if hasattr(config, 'GH_TOKEN') and config.GH_TOKEN:
+        GH_TOKEN = config.GH_TOKEN
+    if hasattr(config, 'HTTP_CACHE_DIR') and config.HTTP_CACHE_DIR:
+        HTTP_CACHE_DIR = config.HTTP_CACHE_DIR
+    if hasattr(config, 'HTTP_CACHE_MAX_MB') and isinstance(config.HTTP_CACHE_MAX_MB, int):
+        HTTP_CACHE_MAX_MB = config.HTTP_CACHE_MAX_MB
+except ImportError:
+    GH_TOKEN = os.environ.get('GH_TOKEN', GH_TOKEN)
+    HTTP_CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', HTTP_CACHE_DIR)
+    try:
+        HTTP_CACHE_MAX_MB = int(os.environ.get('HTTP_CACHE_MAX_MB', str(HTTP_CACHE_MAX_MB)))
+    except ValueError:
+        logger.warning("环境变量中HTTP_CACHE_MAX_MB格式不正确，使用默认值")
+except Exception as e:
+    logger.error(f"读取配置文件时出错: {e}")
+    GH_TOKEN = os.environ.get('GH_TOKEN', "")
+    HTTP_CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', ".http_cache")
+
 # ================= 配置区域 =================
 # 优先从配置文件读取配置，如果配置文件不存在则从环境变量读取
 # 默认配置为空字符串
@@ -54,6 +88,11 @@ OSS_ACCESS_KEY_ID = ""
 OSS_ACCESS_KEY_SECRET = ""
 OSS_ENDPOINT = ""
 OSS_BUCKET_NAME = ""
+# 存储后端："oss" 从OSS读取，"local" 从本地存储目录读取（与main.py的同名配置一致）
+STORAGE_BACKEND = "oss"
+LOCAL_STORAGE_DIR = "oss_upload_simulator"
+# main.py上传数据使用的OSS目录，数据集索引 manifest.json 位于该目录下
+OSS_FILE_PATH = ""
 
 # 尝试从配置文件读取配置
 try:
@@ -67,6 +106,12 @@ try:
         OSS_ENDPOINT = config.OSS_ENDPOINT
     if hasattr(config, 'OSS_BUCKET_NAME') and config.OSS_BUCKET_NAME:
         OSS_BUCKET_NAME = config.OSS_BUCKET_NAME
+    if hasattr(config, 'STORAGE_BACKEND') and config.STORAGE_BACKEND:
+        STORAGE_BACKEND = config.STORAGE_BACKEND
+    if hasattr(config, 'LOCAL_STORAGE_DIR') and config.LOCAL_STORAGE_DIR:
+        LOCAL_STORAGE_DIR = config.LOCAL_STORAGE_DIR
+    if hasattr(config, 'OSS_FILE_PATH') and config.OSS_FILE_PATH:
+        OSS_FILE_PATH = config.OSS_FILE_PATH
     logger.info("成功从配置文件读取配置")
 except ImportError:
     logger.info("未找到配置文件，将从环境变量读取配置")
@@ -75,6 +120,9 @@ except ImportError:
     OSS_ACCESS_KEY_SECRET = os.environ.get('OSS_ACCESS_KEY_SECRET', OSS_ACCESS_KEY_SECRET)
     OSS_ENDPOINT = os.environ.get('OSS_ENDPOINT', OSS_ENDPOINT)
     OSS_BUCKET_NAME = os.environ.get('OSS_BUCKET_NAME', OSS_BUCKET_NAME)
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', STORAGE_BACKEND)
+    LOCAL_STORAGE_DIR = os.environ.get('LOCAL_STORAGE_DIR', LOCAL_STORAGE_DIR)
+    OSS_FILE_PATH = os.environ.get('OSS_FILE_PATH', OSS_FILE_PATH)
 except Exception as e:
     logger.error(f"读取配置文件时出错: {e}")
     # 出错时从环境变量读取配置
@@ -82,21 +130,43 @@ except Exception as e:
     OSS_ACCESS_KEY_SECRET = os.environ.get('OSS_ACCESS_KEY_SECRET', "")
     OSS_ENDPOINT = os.environ.get('OSS_ENDPOINT', "")
     OSS_BUCKET_NAME = os.environ.get('OSS_BUCKET_NAME', "")
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', "oss")
+    LOCAL_STORAGE_DIR = os.environ.get('LOCAL_STORAGE_DIR', "oss_upload_simulator")
+    OSS_FILE_PATH = os.environ.get('OSS_FILE_PATH', "")
 
 # ================= 工具函数 =================
-def get_oss_bucket():
-    """获取OSS Bucket对象"""
-    if not all([OSS_ACCESS_KEY_ID, OSS_ACCESS_KEY_SECRET, OSS_ENDPOINT, OSS_BUCKET_NAME]):
+def get_storage():
+    """按STORAGE_BACKEND获取存储（OSS复用进程内共享的Bucket连接池，或本地存储目录）"""
+    storage = create_storage(STORAGE_BACKEND, LOCAL_STORAGE_DIR, OSS_ACCESS_KEY_ID, OSS_ACCESS_KEY_SECRET,
+                             OSS_ENDPOINT, OSS_BUCKET_NAME)
+    if storage is None:
         logger.error("OSS配置不完整")
-        return None
-    
-    auth = oss2.Auth(OSS_ACCESS_KEY_ID, OSS_ACCESS_KEY_SECRET)
-    return oss2.Bucket(auth, OSS_ENDPOINT, OSS_BUCKET_NAME)
+    return storage
+
+def load_manifest(storage):
+    """读取main.py维护的数据集索引，不存在或读取失败时返回None"""
+    oss_directory = OSS_FILE_PATH.rstrip('/') + '/' if OSS_FILE_PATH else ''
+    manifest = Manifest(storage, oss_directory + MANIFEST_FILENAME)
+    try:
+        if manifest.load():
+            return manifest
+    except Exception as e:
+        logger.warning(f"读取数据集索引失败: {e}")
+    return None
+
+def get_type_prefix(category):
+    """与main.py中的文件格式保持一致"""
+    return category.lower() if category and category.lower() != "all" else "all"
+
+# gzip文件头
+GZIP_MAGIC = b'\x1f\x8b'
 
-def fetch_data_from_oss(bucket, date_str, category):
-    """从 OSS 读取指定日期和分类的数据文件 (优先JSON)"""
-    # 与main.py中的文件格式保持一致
-    type_prefix = category.lower() if category and category.lower() != "all" else "all"
+def fetch_data_from_oss(storage, date_str, category, manifest=None):
+    """从存储（OSS或本地存储目录）读取指定日期和分类的数据文件 (优先JSON)
+
+    数据集索引中有该日期的条目时直接读取索引中的对象，否则依次尝试历史上使用过的文件名。
+    """
+    type_prefix = get_type_prefix(category)
     
     # 首先尝试读取JSON文件
     json_file_paths = [
@@ -107,15 +177,25 @@ def fetch_data_from_oss(bucket, date_str, category):
         f"{date_str.replace('-', '')}.json"  # 格式: YYYYMMDD.json
     ]
     
+    # 索引中的对象键优先（通常一次GET即可），索引建立之前的数据仍按上面的文件名查找
+    entry = manifest.lookup(type_prefix, date_str) if manifest is not None else None
+    if entry:
+        json_file_paths.insert(0, entry['key'])
+    elif manifest is not None:
+        logger.info(f"数据集索引中没有 {type_prefix} 在 {date_str} 的数据，按文件名查找")
+    
     for file_path in json_file_paths:
         try:
             logger.info(f"尝试读取文件: {file_path}")
-            obj = bucket.get_object(file_path)
-            content = obj.read().decode('utf-8-sig')  # utf-8-sig 去除 BOM
+            content = storage.get(file_path)
+            # main.py 开启 OUTPUT_COMPRESSION="gzip" 时上传的是gzip压缩的JSON
+            if content[:2] == GZIP_MAGIC:
+                content = gzip.decompress(content)
+            content = content.decode('utf-8-sig')  # utf-8-sig 去除 BOM
             data = json.loads(content)
             logger.info(f"成功读取JSON文件: {file_path}")
             return data
-        except oss2.exceptions.NoSuchKey:
+        except ObjectNotFound:
             # 文件不存在，尝试下一个路径
             logger.info(f"尝试读取JSON文件失败(文件不存在): {file_path}")
             continue
@@ -135,14 +215,14 @@ def get_project_image_url(project_name, project_url):
     # 如果是GitHub项目，尝试从README中提取图片
     if project_url and "github.com" in project_url:
         try:
-            # 构建raw内容URL
-            repo_path = project_url.replace("https://github.com/", "").replace("http://github.com/", "")
-            readme_url = f"https://raw.githubusercontent.com/{repo_path}/main/README.md"
+            repo_path = project_url.replace("https://github.com/", "").replace("http://github.com/", "").strip('/')
             
-            # 发送请求获取README内容
-            response = requests.get(readme_url, timeout=5)
-            if response.status_code == 200:
-                readme_content = response.text
+            # 通过README API获取默认分支下的README，与main.py共用同一套缓存
+            client = get_github_client(GH_TOKEN, cache=get_http_cache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_MB))
+            # 配图只是尽力获取：使用较短的超时，遇到限流不等待，直接使用占位图
+            readme, status_code = client.get_readme(repo_path, timeout=5, max_wait=0)
+            if readme is not None:
+                readme_content = readme['text']
                 
                 # 尝试提取README中的第一张图片
                 # 匹配Markdown格式的图片: ![alt](url)
@@ -154,7 +234,12 @@ def get_project_image_url(project_name, project_url):
                     if img_url.startswith('/'):
                         img_url = f"https://github.com{img_url}"
                     elif not img_url.startswith('http'):
-                        img_url = f"https://github.com/{repo_path}/raw/main/{img_url}"
+                        # 相对于README所在目录（已包含实际的默认分支）
+                        readme_dir = (readme.get('download_url') or '').rsplit('/', 1)[0]
+                        if readme_dir:
+                            img_url = urljoin(readme_dir + '/', img_url)
+                        else:
+                            img_url = f"https://github.com/{repo_path}/raw/HEAD/{img_url}"
                     logger.info(f"从GitHub项目README中提取图片URL: {img_url}")
                     return img_url
         except Exception as e:
@@ -183,11 +268,8 @@ def call_ai_api(prompt, max_tokens=1000, temperature=0.8):
         """
     
     try:
-        # 初始化OpenAI客户端
-        client = openai.OpenAI(
-            api_key=AI_API_KEY,
-            base_url=AI_BASE_URL
-        )
+        # 复用进程内共享的OpenAI客户端，每篇文章的多次调用共用同一个连接池
+        client = get_openai_client(AI_API_KEY, AI_BASE_URL)
         
         # 调用AI API
         response = client.chat.completions.create(
@@ -477,23 +559,31 @@ def generate_wechat_article(data, category, date_str):
 
 def main():
     """主函数"""
-    # 解析命令行参数
+    # 解析命令行参数（日期可以为 latest，表示数据集索引中该分类最新的数据）
     category = sys.argv[1] if len(sys.argv) > 1 else "all"
     date_str = sys.argv[2] if len(sys.argv) > 2 else datetime.now().strftime('%Y-%m-%d')
     
     # 检查是否是测试模式（只处理2条项目）
     is_test_mode = len(sys.argv) > 3 and sys.argv[3] == "test"
     
-    logger.info(f"开始生成公众号文章: 分类={category}, 日期={date_str}, 测试模式={is_test_mode}")
-    
-    # 获取OSS Bucket
-    bucket = get_oss_bucket()
-    if not bucket:
+    # 获取存储
+    storage = get_storage()
+    if not storage:
         logger.error("无法连接到OSS，程序退出")
         return
     
-    # 从OSS读取数据
-    data = fetch_data_from_oss(bucket, date_str, category)
+    manifest = load_manifest(storage)
+    if date_str == "latest":
+        latest_date, _ = manifest.latest(get_type_prefix(category)) if manifest is not None else (None, None)
+        if not latest_date:
+            logger.error(f"数据集索引中没有分类 {category} 的数据，无法确定最新日期")
+            return
+        date_str = datetime.strptime(latest_date, '%Y%m%d').strftime('%Y-%m-%d')
+    
+    logger.info(f"开始生成公众号文章: 分类={category}, 日期={date_str}, 测试模式={is_test_mode}")
+    
+    # 从OSS（或本地存储目录）读取数据
+    data = fetch_data_from_oss(storage, date_str, category, manifest)
     if not data:
         logger.error("未获取到数据，无法生成文章")
         return
@@ -512,6 +602,11 @@ def main():
         f.write(article)
     
     logger.info(f"公众号文章已保存到: {filename}")
+    
+    # 保存README缓存索引，下次运行时可直接发送条件请求
+    http_cache = get_http_cache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_MB)
+    if http_cache is not None:
+        http_cache.save()
 
 if __name__ == "__main__":
     main()
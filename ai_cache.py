@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from storage import ObjectNotFound
+
+logger = logging.getLogger(__name__)
+
+
+class AIResultCache:
+    """AI分析结果缓存，按TTL过期
+
+    缓存键为 (模型, 提示词模板版本, 项目名称, 描述, 截断后的README, 标签) 的哈希，输入不变时直接复用上次的结果。
+    缓存可保存为本地JSON文件，也可保存为存储（OSS Bucket或本地存储目录）中的一个对象，便于FC冷启动之间共享。
+    """
+    def __init__(self, ttl_seconds, path=None, storage=None, oss_key=None):
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.storage = storage
+        self.oss_key = oss_key
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def make_key(model, prompt_version, repo_name, description, readme, tags):
+        """根据影响AI结果的全部输入生成缓存键"""
+        payload = json.dumps([model, prompt_version, repo_name, description, readme, tags], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def load(self):
+        """从本地文件或存储读取缓存，读取失败时从空缓存开始"""
+        try:
+            if self.storage is not None:
+                content = self.storage.get(self.oss_key).decode('utf-8')
+            elif self.path and os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            else:
+                return
+            self.entries = json.loads(content)
+            logger.info(f"已加载AI结果缓存，共 {len(self.entries)} 条")
+        except ObjectNotFound:
+            logger.info("存储中暂无AI结果缓存，将新建缓存")
+        except Exception as e:
+            logger.warning(f"读取AI结果缓存失败，将新建缓存: {e}")
+            self.entries = {}
+
+    def get(self, key):
+        """返回未过期的缓存结果，不存在或已过期时返回None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and time.time() - entry['created_at'] < self.ttl_seconds:
+                self.stats['hits'] += 1
+                return entry['value']
+            self.stats['misses'] += 1
+            return None
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = {'value': value, 'created_at': time.time()}
+
+    def save(self):
+        """清理过期条目后写回本地文件或存储"""
+        with self.lock:
+            now = time.time()
+            self.entries = {key: entry for key, entry in self.entries.items()
+                            if now - entry['created_at'] < self.ttl_seconds}
+            content = json.dumps(self.entries, ensure_ascii=False)
+        try:
+            if self.storage is not None:
+                self.storage.put(self.oss_key, content.encode('utf-8'))
+            elif self.path:
+                tmp_path = self.path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, self.path)
+            logger.info(f"已保存AI结果缓存，共 {len(self.entries)} 条")
+        except Exception as e:
+            logger.warning(f"保存AI结果缓存失败: {e}")
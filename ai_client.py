@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+
+import httpx
+from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+# 连接池和超时的默认值：保持足够的长连接供并发请求复用，避免每次调用重新建立TCP/TLS连接
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 120.0
+DEFAULT_MAX_RETRIES = 2
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_openai_client(api_key, base_url, max_connections=DEFAULT_MAX_CONNECTIONS):
+    """获取进程内共享的OpenAI客户端（按 api_key + base_url 缓存），所有调用复用同一个连接池"""
+    key = (api_key, base_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY
+                ),
+                timeout=httpx.Timeout(DEFAULT_READ_TIMEOUT, connect=DEFAULT_CONNECT_TIMEOUT)
+            )
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=http_client,
+                max_retries=DEFAULT_MAX_RETRIES
+            )
+            _clients[key] = client
+            logger.info(f"创建共享AI客户端: {base_url}，连接池大小: {max_connections}")
+        return client
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""对比“每次调用新建OpenAI客户端”与“复用共享客户端”的单次调用耗时
+
+默认启动一个本地的OpenAI兼容模拟服务，每个新连接额外等待 --connect-latency-ms 毫秒以模拟TCP/TLS握手开销；
+指定 --base-url 和 --api-key 时直接对真实接口测试（每次调用 max_tokens=1，会产生少量费用）。
+
+用法:
+    python benchmarks/bench_ai_client.py --calls 20
+    python benchmarks/bench_ai_client.py --calls 10 --base-url https://api.openai.com/v1 --api-key sk-xxx --model gpt-3.5-turbo
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from openai import OpenAI
+
+from ai_client import get_openai_client
+
+COMPLETION_RESPONSE = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "bench",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+}
+
+
+def start_mock_server(connect_latency_ms, response_latency_ms):
+    """启动本地OpenAI兼容模拟服务，返回 (server, base_url)"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            # 每个新连接模拟一次握手开销，长连接上的后续请求不再产生该开销
+            time.sleep(connect_latency_ms / 1000.0)
+            super().setup()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(response_latency_ms / 1000.0)
+            body = json.dumps(COMPLETION_RESPONSE).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1"
+
+
+def call(client, model):
+    start = time.perf_counter()
+    client.chat.completions.create(model=model, messages=[{"role": "user", "content": "ping"}], max_tokens=1)
+    return time.perf_counter() - start
+
+
+def run_fresh_client(api_key, base_url, model, calls):
+    """旧方式：每次调用都新建客户端和连接池"""
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        with httpx.Client() as http_client:
+            client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            call(client, model)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run_shared_client(api_key, base_url, model, calls):
+    """新方式：复用 ai_client.get_openai_client 返回的共享客户端"""
+    client = get_openai_client(api_key, base_url)
+    return [call(client, model) for _ in range(calls)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI客户端复用的单次调用耗时对比")
+    parser.add_argument('--calls', type=int, default=20, help="每种方式的调用次数")
+    parser.add_argument('--base-url', help="真实接口地址，不指定时使用本地模拟服务")
+    parser.add_argument('--api-key', default="bench", help="真实接口的API密钥")
+    parser.add_argument('--model', default="bench", help="调用的模型名称")
+    parser.add_argument('--connect-latency-ms', type=float, default=50, help="模拟服务每个新连接的握手开销")
+    parser.add_argument('--response-latency-ms', type=float, default=20, help="模拟服务每次请求的处理时间")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server, base_url = start_mock_server(args.connect_latency_ms, args.response_latency_ms)
+
+    try:
+        fresh = run_fresh_client(args.api_key, base_url, args.model, args.calls)
+        shared = run_shared_client(args.api_key, base_url, args.model, args.calls)
+    finally:
+        if server:
+            server.shutdown()
+
+    print(f"接口: {base_url}，每种方式调用 {args.calls} 次")
+    print(f"{'方式':<12}{'平均(ms)':>12}{'中位数(ms)':>12}")
+    for label, latencies in (("每次新建", fresh), ("共享客户端", shared)):
+        print(f"{label:<12}{statistics.mean(latencies) * 1000:>12.1f}{statistics.median(latencies) * 1000:>12.1f}")
+    saved = (statistics.mean(fresh) - statistics.mean(shared)) * 1000
+    print(f"每次调用平均节省: {saved:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""对比REST与GraphQL两种方式获取项目详情的请求数和耗时
+
+使用 fixtures/github_enrich.json 中记录的响应内容和响应时间回放请求，不访问网络。
+
+用法:
+    python benchmarks/bench_github_backends.py --repos 100 --concurrency 8 --batch-size 30 [--with-tags]
+"""
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from github_client import GitHubClient
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'github_enrich.json')
+
+
+class ReplaySession:
+    """按录制的响应内容和响应时间回放GitHub请求"""
+    def __init__(self, fixture, repos):
+        self.latency = fixture['latency_ms']
+        self.repos = {repo['full_name']: repo for repo in repos}
+        self.lock = threading.Lock()
+        self.request_count = 0
+
+    def _response(self, payload, latency_ms):
+        time.sleep(latency_ms / 1000.0)
+        with self.lock:
+            self.request_count += 1
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(payload).encode('utf-8')
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json; charset=utf-8'})
+        response.encoding = 'utf-8'
+        return response
+
+    def request(self, method, url, headers=None, params=None, json=None, timeout=None):
+        if method == 'POST' and url.endswith('/graphql'):
+            return self._graphql(json)
+        path = url.replace('https://api.github.com/repos/', '')
+        if path.endswith('/readme'):
+            repo = self.repos[path[:-len('/readme')]]
+            payload = {
+                'path': repo['readme_path'],
+                'encoding': 'base64',
+                'content': base64.b64encode(repo['readme'].encode('utf-8')).decode('ascii'),
+                'download_url': f"https://raw.githubusercontent.com/{repo['full_name']}/{repo['default_branch']}/{repo['readme_path']}"
+            }
+            return self._response(payload, self.latency['rest_readme'])
+        if path.endswith('/tags'):
+            repo = self.repos[path[:-len('/tags')]]
+            return self._response([{'name': tag} for tag in repo['tags']], self.latency['rest_tags'])
+        raise ValueError(f"未录制的请求: {method} {url}")
+
+    def _graphql(self, body):
+        variables = body['variables']
+        data = {}
+        index = 0
+        while f"owner{index}" in variables:
+            repo = self.repos[f"{variables[f'owner{index}']}/{variables[f'name{index}']}"]
+            node = {
+                'nameWithOwner': repo['full_name'],
+                'description': repo['description'],
+                'stargazerCount': repo['stargazers_count'],
+                'repositoryTopics': {'nodes': [{'topic': {'name': topic}} for topic in repo['topics']]},
+                'defaultBranchRef': {'name': repo['default_branch']},
+                'refs': {'nodes': [{'name': tag} for tag in repo['tags']]},
+            }
+            for i, path in enumerate(('README.md', 'readme.md', 'Readme.md', 'README.rst', 'README')):
+                node[f"readme{i}"] = {'text': repo['readme']} if path == repo['readme_path'] else None
+            data[f"r{index}"] = node
+            index += 1
+        latency_ms = self.latency['graphql_base'] + self.latency['graphql_per_repo'] * index
+        return self._response({'data': data}, latency_ms)
+
+
+def load_repos(fixture, count):
+    """将录制的项目复制扩展到指定数量（名称加序号后缀以保持唯一）"""
+    repos = []
+    base = fixture['repos']
+    for i in range(count):
+        repo = dict(base[i % len(base)])
+        if i >= len(base):
+            repo['full_name'] = f"{repo['full_name']}-{i // len(base)}"
+        repos.append(repo)
+    return repos
+
+
+def run_rest(fixture, repos, concurrency, with_tags):
+    session = ReplaySession(fixture, repos)
+    client = GitHubClient(token="bench", pool_size=concurrency, session=session)
+
+    def enrich(repo):
+        client.get_readme(repo['full_name'])
+        if with_tags:
+            client.get(f"https://api.github.com/repos/{repo['full_name']}/tags", params={'per_page': 10})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(enrich, repos))
+    return session.request_count, time.perf_counter() - start
+
+
+def run_graphql(fixture, repos, concurrency, batch_size, with_tags):
+    session = ReplaySession(fixture, repos)
+    client = GitHubClient(token="bench", pool_size=concurrency, session=session)
+    batches = [repos[i:i + batch_size] for i in range(0, len(repos), batch_size)]
+
+    def enrich(batch):
+        client.fetch_repos_graphql([repo['full_name'] for repo in batch], tags_limit=10 if with_tags else 0)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(enrich, batches))
+    return session.request_count, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="REST 与 GraphQL 获取项目详情的性能对比")
+    parser.add_argument('--repos', type=int, default=100, help="项目数量")
+    parser.add_argument('--concurrency', type=int, default=8, help="并发数")
+    parser.add_argument('--batch-size', type=int, default=30, help="GraphQL每次查询的项目数量")
+    parser.add_argument('--with-tags', action='store_true', help="同时获取Git标签列表")
+    args = parser.parse_args()
+
+    with open(FIXTURE_PATH, 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+    repos = load_repos(fixture, args.repos)
+
+    rest_requests, rest_seconds = run_rest(fixture, repos, args.concurrency, args.with_tags)
+    graphql_requests, graphql_seconds = run_graphql(fixture, repos, args.concurrency, args.batch_size, args.with_tags)
+
+    print(f"项目数量: {args.repos}，并发数: {args.concurrency}，GraphQL批大小: {args.batch_size}，获取标签: {args.with_tags}")
+    print(f"{'方式':<10}{'请求数':>8}{'耗时(秒)':>12}")
+    print(f"{'REST':<10}{rest_requests:>8}{rest_seconds:>12.2f}")
+    print(f"{'GraphQL':<10}{graphql_requests:>8}{graphql_seconds:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
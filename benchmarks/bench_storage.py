@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""存储层压测：并发执行 put_file / head（含本地CRC64比较）/ get / list，统计各操作的耗时
+
+默认使用本地存储（STORAGE_BACKEND="local" 时流水线使用的同一个实现），在临时目录中进行，不访问网络。
+
+用法:
+    python benchmarks/bench_storage.py --files 50 --size-kb 256 --concurrency 4
+    python benchmarks/bench_storage.py --dir /mnt/data/bench_storage --keep
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import LocalStorage, file_crc64
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def run(label, executor, func, items):
+    """并发执行func，返回 (标签, 每次耗时列表, 总耗时)"""
+    start = time.perf_counter()
+    latencies = list(executor.map(func, items))
+    return label, latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="存储层各操作的耗时压测")
+    parser.add_argument('--files', type=int, default=50, help="文件数量")
+    parser.add_argument('--size-kb', type=int, default=256, help="每个文件的大小（KB）")
+    parser.add_argument('--concurrency', type=int, default=4, help="并发数")
+    parser.add_argument('--dir', help="存储目录，不指定时使用临时目录")
+    parser.add_argument('--keep', action='store_true', help="结束后保留存储目录")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_storage_")
+    storage_dir = args.dir or os.path.join(work_dir, "storage")
+    storage = LocalStorage(storage_dir)
+
+    sources = []
+    for i in range(args.files):
+        path = os.path.join(work_dir, f"bench_projects_{i:04d}.json")
+        with open(path, 'wb') as f:
+            f.write(os.urandom(args.size_kb * 1024))
+        sources.append((f"bench/bench_projects_{i:04d}.json", path))
+
+    def put(item):
+        return timed(storage.put_file, item[0], item[1])
+
+    def head(item):
+        def compare():
+            info = storage.head(item[0])
+            return info is not None and info.crc64 == file_crc64(item[1])
+        return timed(compare)
+
+    def get(item):
+        return timed(storage.get, item[0])
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+            results = [
+                run("put_file", executor, put, sources),
+                run("head+CRC64", executor, head, sources),
+                run("get", executor, get, sources),
+            ]
+        start = time.perf_counter()
+        listed = sum(1 for _ in storage.list("bench/"))
+        list_seconds = time.perf_counter() - start
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            if args.dir:
+                shutil.rmtree(storage_dir, ignore_errors=True)
+
+    total_mb = args.files * args.size_kb / 1024
+    print(f"存储目录: {storage_dir}，{args.files} 个文件 × {args.size_kb} KB，并发 {args.concurrency}")
+    print(f"{'操作':<12}{'平均(ms)':>12}{'中位数(ms)':>12}{'总耗时(s)':>12}{'MB/s':>10}")
+    for label, latencies, seconds in results:
+        print(f"{label:<12}{statistics.mean(latencies) * 1000:>12.2f}{statistics.median(latencies) * 1000:>12.2f}"
+              f"{seconds:>12.2f}{total_mb / seconds if seconds > 0 else 0:>10.1f}")
+    print(f"list 列举 {listed} 个对象耗时 {list_seconds * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 断点恢复时需要还原到项目上的详情字段
+RESTORED_FIELDS = ('readme', 'all_tags', 'default_branch')
+
+
+class CheckpointJournal:
+    """运行断点日志：每完成一个项目（详情 + AI结果）就追加一行JSONL，中断后重新运行时跳过已完成的项目
+
+    正常结束后调用 clear() 删除日志；进程被强制结束时最后一行可能不完整，读取时会忽略。
+    """
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.file = None
+        self.stats = {'restored': 0, 'recorded': 0}
+
+    def load(self):
+        """读取上次中断前完成的项目"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self.entries[entry['full_name']] = entry
+        logger.info(f"已加载断点日志 {self.path}，{len(self.entries)} 个项目已完成")
+
+    def restore(self, repo):
+        """项目已在上次运行中完成时，将详情还原到repo上并返回AI结果，否则返回None"""
+        entry = self.entries.get(repo.get('full_name'))
+        if entry is None:
+            return None
+        for field in RESTORED_FIELDS:
+            if field in entry:
+                repo[field] = entry[field]
+        with self.lock:
+            self.stats['restored'] += 1
+        return entry['ai_result']
+
+    def record(self, repo, ai_result):
+        """追加一个已完成的项目并立即写入磁盘，AI分析失败的结果不记录，重新运行时会再次分析"""
+        if not repo.get('full_name') or ai_result.get('fallback'):
+            return
+        entry = {'full_name': repo['full_name'], 'ai_result': ai_result}
+        entry.update({field: repo[field] for field in RESTORED_FIELDS if field in repo})
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self.lock:
+            try:
+                if self.file is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    self.file = open(self.path, 'a', encoding='utf-8')
+                self.file.write(line)
+                self.file.flush()
+                self.entries[repo['full_name']] = entry
+                self.stats['recorded'] += 1
+            except OSError as e:
+                logger.warning(f"写入断点日志失败: {e}")
+
+    def clear(self):
+        """全部输出完成后删除断点日志"""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.entries = {}
+            try:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+            except OSError as e:
+                logger.warning(f"删除断点日志失败: {e}")
@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+import time
+import base64
+import logging
+import threading
+
+import requests
+
+from rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# 各类API的默认限额：(窗口内请求数, 窗口秒数)
+# search: 认证后30次/分钟，未认证10次/分钟
+# core: 认证后5000次/小时，未认证60次/小时
+# graphql: 认证后5000点/小时（未认证不可用），按每次查询计1次近似
+# raw: raw.githubusercontent.com 不返回限额响应头，使用保守的每秒请求数
+DEFAULT_RATE_LIMITS = {
+    'authenticated': {'search': (30, 60), 'core': (5000, 3600), 'graphql': (5000, 3600), 'raw': (20, 1)},
+    'anonymous': {'search': (10, 60), 'core': (60, 3600), 'graphql': (60, 3600), 'raw': (20, 1)},
+}
+
+API_URL = "https://api.github.com"
+SEARCH_URL = f"{API_URL}/search/repositories"
+# 搜索API单页最多返回100条，单个查询最多返回1000条
+SEARCH_MAX_PER_PAGE = 100
+SEARCH_MAX_RESULTS = 1000
+
+GRAPHQL_URL = f"{API_URL}/graphql"
+# GraphQL批量查询时依次尝试的README文件名（HEAD即默认分支）
+GRAPHQL_README_PATHS = ('README.md', 'readme.md', 'Readme.md', 'README.rst', 'README')
+# 每个项目需要的字段，{readme_fields} 和 {tags_field} 在构造查询时填充
+GRAPHQL_REPO_FRAGMENT = """
+fragment RepoFields on Repository {{
+  nameWithOwner
+  description
+  stargazerCount
+  repositoryTopics(first: 20) {{ nodes {{ topic {{ name }} }} }}
+  defaultBranchRef {{ name }}
+  {readme_fields}
+  {tags_field}
+}}
+"""
+
+# 使用条件请求缓存的API类别（搜索结果每天变化且依赖分页链接，不做缓存）
+CACHEABLE_FAMILIES = ('core', 'raw')
+
+# 触发二级限流且服务端未给出等待时间时的默认等待秒数（GitHub文档建议至少1分钟）
+SECONDARY_RATE_LIMIT_WAIT = 60
+
+
+class GitHubClient:
+    """根据 X-RateLimit-* / Retry-After 响应头自动限速的 GitHub 客户端（线程安全）"""
+    def __init__(self, token="", pool_size=10, max_wait=900, max_retries=3, session=None, cache=None):
+        self.token = token
+        self.cache = cache
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+
+        if session is None:
+            session = requests.Session()
+            # 连接池大小与并发数匹配，避免并发请求时连接被丢弃
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(10, pool_size))
+            session.mount('https://', adapter)
+        self.session = session
+
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        if token:
+            headers["Authorization"] = f"token {token}"
+        # 解决Unicode编码问题
+        self.headers = {k: v.encode('ascii', 'ignore').decode('ascii') for k, v in headers.items()}
+
+        limits = DEFAULT_RATE_LIMITS['authenticated' if token else 'anonymous']
+        self.buckets = {family: TokenBucket(count / window, count) for family, (count, window) in limits.items()}
+        self.blocked_until = {family: 0.0 for family in limits}
+        # 已提示过“等待时间超过max_wait”的限流窗口，同一窗口只提示一次
+        self.skip_warned_until = {family: 0.0 for family in limits}
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'rate_limited': 0, 'waited_seconds': 0.0}
+
+    @staticmethod
+    def get_family(url):
+        """根据URL判断所属的API类别"""
+        if 'raw.githubusercontent.com' in url:
+            return 'raw'
+        if '/search/' in url:
+            return 'search'
+        if url.rstrip('/').endswith('/graphql'):
+            return 'graphql'
+        return 'core'
+
+    def _wait_for_quota(self, family, max_wait=None):
+        """等待该类API的限流窗口解除并获取令牌
+
+        需要等待的时间超过 max_wait（默认为客户端的 max_wait）时不再等待，直接发送请求（服务端返回限流响应，由调用方按失败处理），
+        避免额度用尽后每个请求都阻塞到 X-RateLimit-Reset（最长可达1小时）。
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        with self.lock:
+            wait_time = self.blocked_until[family] - time.time()
+            if wait_time > max_wait:
+                if self.skip_warned_until[family] != self.blocked_until[family]:
+                    self.skip_warned_until[family] = self.blocked_until[family]
+                    logger.warning(f"GitHub {family} API 额度已用尽，需等待 {wait_time:.0f} 秒，超过最大等待时间 {max_wait} 秒，"
+                                   f"在额度恢复前不再等待")
+                return
+        waited = 0.0
+        if wait_time > 0:
+            logger.info(f"GitHub {family} API 额度已用尽，等待 {wait_time:.1f} 秒...")
+            time.sleep(wait_time)
+            waited += wait_time
+        waited += self.buckets[family].acquire()
+        if waited > 0:
+            with self.lock:
+                self.stats['waited_seconds'] += waited
+
+    def _update_from_response(self, family, response):
+        """根据响应头更新剩余额度和限流窗口"""
+        headers = response.headers
+        # X-RateLimit-Resource 给出了服务端实际计入的额度类别
+        resource = headers.get('X-RateLimit-Resource')
+        if resource in self.buckets:
+            family = resource
+
+        blocked_until = 0.0
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is not None and remaining.isdigit():
+            self.buckets[family].limit_tokens(int(remaining))
+            if int(remaining) == 0 and reset and reset.isdigit():
+                blocked_until = int(reset) + 1
+
+        retry_after = headers.get('Retry-After')
+        if retry_after and retry_after.isdigit() and response.status_code in (403, 429):
+            blocked_until = max(blocked_until, time.time() + int(retry_after))
+
+        if blocked_until:
+            with self.lock:
+                self.blocked_until[family] = max(self.blocked_until[family], blocked_until)
+
+    @staticmethod
+    def _is_rate_limited(response):
+        """判断响应是否为限流导致的失败"""
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        if response.headers.get('X-RateLimit-Remaining') == '0' or response.headers.get('Retry-After'):
+            return True
+        return 'rate limit' in response.text.lower()
+
+    def get(self, url, params=None, headers=None, family=None, max_wait=None, **kwargs):
+        """发送GET请求，必要时等待限流窗口并重试（max_wait 覆盖客户端的最大等待时间）
+
+        启用缓存时对 core/raw 类请求发送条件请求，服务端返回304时直接使用缓存内容
+        （304响应不计入 core 额度，也不需要重新下载响应体）。
+        """
+        family = family or self.get_family(url)
+        request_headers = dict(self.headers)
+        if headers:
+            request_headers.update(headers)
+        kwargs.setdefault('timeout', 30)
+
+        cache_key = None
+        if self.cache is not None and family in CACHEABLE_FAMILIES:
+            cache_key = self.cache.make_key(url, params)
+            request_headers.update(self.cache.conditional_headers(cache_key))
+
+        response = self._request_with_retry('GET', url, request_headers, family, max_wait, params=params, **kwargs)
+
+        if cache_key is not None:
+            if response.status_code == 304:
+                cached_response = self.cache.build_response(cache_key, response.url)
+                if cached_response is not None:
+                    return cached_response
+                # 缓存文件已丢失，去掉条件请求头重新获取
+                for name in ('If-None-Match', 'If-Modified-Since'):
+                    request_headers.pop(name, None)
+                response = self._request_with_retry('GET', url, request_headers, family, max_wait, params=params, **kwargs)
+            self.cache.store(cache_key, response)
+        return response
+
+    def post(self, url, json=None, headers=None, family=None, **kwargs):
+        """发送POST请求（用于GraphQL），必要时等待限流窗口并重试"""
+        family = family or self.get_family(url)
+        request_headers = dict(self.headers)
+        if headers:
+            request_headers.update(headers)
+        kwargs.setdefault('timeout', 60)
+        return self._request_with_retry('POST', url, request_headers, family, json=json, **kwargs)
+
+    def _request_with_retry(self, method, url, request_headers, family, max_wait=None, **kwargs):
+        """发送请求，遇到限流时等待后重试"""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_quota(family, max_wait)
+            response = self.session.request(method, url, headers=request_headers, **kwargs)
+            with self.lock:
+                self.stats['requests'] += 1
+            self._update_from_response(family, response)
+
+            if not self._is_rate_limited(response) or attempt == self.max_retries:
+                return response
+
+            with self.lock:
+                self.stats['rate_limited'] += 1
+                if self.blocked_until[family] <= time.time():
+                    # 二级限流可能不带任何限额响应头
+                    self.blocked_until[family] = time.time() + SECONDARY_RATE_LIMIT_WAIT
+                wait_time = self.blocked_until[family] - time.time()
+
+            if wait_time > max_wait:
+                logger.warning(f"GitHub {family} API 限流需等待 {wait_time:.0f} 秒，超过最大等待时间 {max_wait} 秒，放弃重试")
+                return response
+            logger.warning(f"触发GitHub {family} API 限流 (状态码 {response.status_code})，{wait_time:.0f}秒后重试 ({attempt+1}/{self.max_retries})")
+
+        return response
+
+    def get_readme(self, full_name, **kwargs):
+        """通过README API获取项目默认分支下的README（自动识别README.rst等文件名）
+
+        kwargs 传给 get()（如 timeout、max_wait），返回 (README信息, 状态码)，成功时README信息包含 text、path、download_url，失败时为None。
+        """
+        response = self.get(f"{API_URL}/repos/{full_name}/readme", **kwargs)
+        if response.status_code != 200:
+            return None, response.status_code
+
+        data = response.json()
+        if data.get('encoding') == 'base64':
+            text = base64.b64decode(data.get('content', '')).decode('utf-8', errors='replace')
+        elif data.get('download_url'):
+            # 超过1MB的文件不会内嵌内容，需要从download_url单独下载
+            raw_response = self.get(data['download_url'], **kwargs)
+            if raw_response.status_code != 200:
+                return None, raw_response.status_code
+            text = raw_response.text
+        else:
+            text = data.get('content', '')
+        return {'text': text, 'path': data.get('path'), 'download_url': data.get('download_url')}, 200
+
+    def fetch_repos_graphql(self, full_names, tags_limit=0):
+        """用一次带别名的GraphQL查询批量获取多个项目的元数据和README
+
+        返回以 full_name 为键的字典，查询失败时返回None；单个项目不存在时不会出现在结果中。
+        GraphQL API 需要Token认证。
+        """
+        readme_fields = "\n  ".join(
+            f'readme{i}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}'
+            for i, path in enumerate(GRAPHQL_README_PATHS)
+        )
+        tags_field = ''
+        if tags_limit:
+            tags_field = (f'refs(refPrefix: "refs/tags/", first: {int(tags_limit)}, '
+                          f'orderBy: {{field: TAG_COMMIT_DATE, direction: DESC}}) {{ nodes {{ name }} }}')
+        fragment = GRAPHQL_REPO_FRAGMENT.format(readme_fields=readme_fields, tags_field=tags_field)
+
+        variable_defs = []
+        selections = []
+        variables = {}
+        for i, full_name in enumerate(full_names):
+            owner, name = full_name.split('/', 1)
+            variable_defs.append(f"$owner{i}: String!, $name{i}: String!")
+            selections.append(f"r{i}: repository(owner: $owner{i}, name: $name{i}) {{ ...RepoFields }}")
+            variables[f"owner{i}"] = owner
+            variables[f"name{i}"] = name
+        query = f"query({', '.join(variable_defs)}) {{\n  " + "\n  ".join(selections) + "\n}\n" + fragment
+
+        response = self.post(GRAPHQL_URL, json={"query": query, "variables": variables})
+        if response.status_code != 200:
+            logger.error(f"GitHub GraphQL Error: {response.status_code} {response.text}")
+            return None
+        payload = response.json()
+        for error in payload.get('errors') or []:
+            # 单个项目出错（如已删除）不影响其它项目
+            logger.warning(f"GitHub GraphQL 查询部分出错: {error.get('message')}")
+        data = payload.get('data') or {}
+
+        results = {}
+        for i, full_name in enumerate(full_names):
+            node = data.get(f"r{i}")
+            if not node:
+                continue
+            readme = None
+            for j in range(len(GRAPHQL_README_PATHS)):
+                blob = node.get(f"readme{j}")
+                if blob and blob.get('text'):
+                    readme = blob['text']
+                    break
+            results[full_name] = {
+                'description': node.get('description'),
+                'stargazers_count': node.get('stargazerCount'),
+                'topics': [topic['topic']['name'] for topic in node['repositoryTopics']['nodes']],
+                'default_branch': (node.get('defaultBranchRef') or {}).get('name'),
+                'readme': readme,
+                'tags': [ref['name'] for ref in (node.get('refs') or {}).get('nodes', [])],
+            }
+        return results
+
+    def search_repositories(self, query, count, min_stars=5000):
+        """按Star降序分页搜索项目，每取到一页就逐个产出，直到达到count个
+
+        query 为除Star范围外的其它搜索条件（如topic）。单个查询超过1000条结果时，
+        以已取到的最低Star数为上界拆分出新的Star区间继续搜索。
+        """
+        per_page = min(SEARCH_MAX_PER_PAGE, count)
+        seen_ids = set()
+        yielded = 0
+        upper_stars = None
+
+        while yielded < count:
+            if upper_stars is None:
+                star_filter = f"stars:>{min_stars}"
+            else:
+                star_filter = f"stars:{min_stars + 1}..{upper_stars}"
+            params = {
+                "q": f"{star_filter} {query}".strip(),
+                "sort": "stars",
+                "order": "desc",
+                "per_page": per_page
+            }
+            logger.info(f"GitHub搜索条件: {params['q']}")
+
+            url = SEARCH_URL
+            page = 1
+            lowest_stars = None
+            window_results = 0
+            total_count = 0
+            while url and yielded < count:
+                response = self.get(url, params=params)
+                if response.status_code != 200:
+                    logger.error(f"GitHub API Error: {response.text}")
+                    return
+                data = response.json()
+                total_count = data.get('total_count', 0)
+                items = data.get('items', [])
+                logger.info(f"已获取搜索结果第 {page} 页，共 {len(items)} 个项目")
+
+                for item in items:
+                    window_results += 1
+                    lowest_stars = item.get('stargazers_count', lowest_stars)
+                    if item['id'] in seen_ids:
+                        continue
+                    seen_ids.add(item['id'])
+                    yield item
+                    yielded += 1
+                    if yielded >= count:
+                        return
+
+                # 下一页的URL已包含全部查询参数
+                url = response.links.get('next', {}).get('url')
+                params = None
+                page += 1
+
+            # 当前区间的结果已全部取完，无需再拆分
+            if total_count <= window_results or lowest_stars is None or lowest_stars <= min_stars:
+                return
+            # 同一Star数的项目超过1000个时无法继续拆分
+            if lowest_stars == upper_stars:
+                logger.warning(f"Star数为 {lowest_stars} 的项目超过搜索上限，停止拆分")
+                return
+            upper_stars = lowest_stars
+            logger.info(f"搜索结果超过 {SEARCH_MAX_RESULTS} 条上限，拆分Star区间继续搜索: <= {upper_stars}")
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_github_client(token="", pool_size=10, cache=None):
+    """获取进程内共享的GitHubClient，所有调用方共用同一份限流状态和缓存"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None or _shared_client.token != token:
+            _shared_client = GitHubClient(token=token, pool_size=pool_size, cache=cache)
+        elif cache is not None and _shared_client.cache is None:
+            _shared_client.cache = cache
+        return _shared_client
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# 缓存命中时需要还原的响应头
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Link')
+
+
+class HTTPCache:
+    """基于 ETag/Last-Modified 条件请求的磁盘HTTP缓存（线程安全，超出容量时按LRU淘汰）
+
+    响应体按URL的哈希保存为单独文件，元数据（校验值、大小、最近使用时间）保存在 index.json 中。
+    """
+    def __init__(self, cache_dir, max_size_bytes):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evicted': 0, 'bytes_saved': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._load_index()
+        self.total_size = sum(entry['size'] for entry in self.index.values())
+
+    def _load_index(self):
+        """读取缓存索引，并清理索引中不存在的响应体文件"""
+        index = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"HTTP缓存索引损坏，将重新建立: {e}")
+                index = {}
+        index = {key: entry for key, entry in index.items() if os.path.exists(self._body_path(key))}
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.body') and filename[:-5] not in index:
+                os.remove(os.path.join(self.cache_dir, filename))
+        return index
+
+    @staticmethod
+    def make_key(url, params=None):
+        """根据完整请求URL生成缓存键"""
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        return hashlib.sha1(full_url.encode('utf-8')).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.body")
+
+    def conditional_headers(self, key):
+        """返回条件请求头（If-None-Match / If-Modified-Since），无缓存时返回空字典"""
+        with self.lock:
+            entry = self.index.get(key)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def build_response(self, key, url):
+        """服务端返回304时，用缓存内容构造一个200响应；缓存文件丢失时返回None"""
+        with self.lock:
+            entry = self.index.get(key)
+            if not entry:
+                return None
+            try:
+                with open(self._body_path(key), 'rb') as f:
+                    content = f.read()
+            except OSError:
+                self.index.pop(key, None)
+                return None
+            entry['last_used'] = time.time()
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += entry['size']
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = content
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def store(self, key, response):
+        """保存带有 ETag/Last-Modified 的200响应"""
+        with self.lock:
+            self.stats['misses'] += 1
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+
+        content = response.content
+        with self.lock:
+            old_entry = self.index.pop(key, None)
+            if old_entry:
+                self.total_size -= old_entry['size']
+            try:
+                with open(self._body_path(key), 'wb') as f:
+                    f.write(content)
+            except OSError as e:
+                logger.warning(f"写入HTTP缓存失败: {e}")
+                return
+            self.index[key] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': len(content),
+                'last_used': time.time(),
+                'headers': {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+            }
+            self.total_size += len(content)
+            self._evict()
+
+    def _evict(self):
+        """超出容量上限时淘汰最久未使用的缓存（调用方需持有锁）"""
+        if self.total_size <= self.max_size_bytes:
+            return
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]['last_used']):
+            if self.total_size <= self.max_size_bytes:
+                break
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+            del self.index[key]
+            self.total_size -= entry['size']
+            self.stats['evicted'] += 1
+
+    def save(self):
+        """将缓存索引写回磁盘"""
+        with self.lock:
+            tmp_path = self.index_path + '.tmp'
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.index, f)
+                os.replace(tmp_path, self.index_path)
+            except OSError as e:
+                logger.warning(f"保存HTTP缓存索引失败: {e}")
+
+
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_http_cache(cache_dir, max_size_mb):
+    """获取指定目录的共享HTTP缓存，目录不可写时返回None"""
+    with _shared_caches_lock:
+        if cache_dir not in _shared_caches:
+            try:
+                _shared_caches[cache_dir] = HTTPCache(cache_dir, int(max_size_mb * 1024 * 1024))
+            except OSError as e:
+                logger.warning(f"无法创建HTTP缓存目录 {cache_dir}，将不使用缓存: {e}")
+                return None
+        return _shared_caches[cache_dir]
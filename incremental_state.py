@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from storage import ObjectNotFound
+
+logger = logging.getLogger(__name__)
+
+
+def readme_hash(readme):
+    return hashlib.sha256((readme or "").encode('utf-8')).hexdigest()
+
+
+class IncrementalState:
+    """增量运行状态：记录每个项目的 pushed_at/updated_at、README哈希和AI分析结果
+
+    每次运行保存为 {前缀}_state_{年月日}.json（本地文件或存储中的对象），下次运行读取最近一天的状态，
+    数据未变化的项目直接复用上次的结果。
+    """
+    def __init__(self, prefix, directory="", storage=None, lookback_days=3):
+        self.prefix = prefix
+        self.directory = directory
+        self.storage = storage
+        self.lookback_days = lookback_days
+        self.previous = {}
+        self.current = {}
+        self.lock = threading.Lock()
+        self.stats = {'skipped_enrich': 0, 'reused_ai': 0}
+
+    def _location(self, date):
+        filename = f"{self.prefix}_state_{date.strftime('%Y%m%d')}.json"
+        return self.directory + filename if self.storage is not None else os.path.join(self.directory, filename)
+
+    def load(self, today=None):
+        """读取今天之前最近一天的状态，找不到时从空状态开始"""
+        today = today or datetime.now()
+        for days in range(1, self.lookback_days + 1):
+            location = self._location(today - timedelta(days=days))
+            try:
+                if self.storage is not None:
+                    content = self.storage.get(location).decode('utf-8')
+                elif os.path.exists(location):
+                    with open(location, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                else:
+                    continue
+                self.previous = json.loads(content)
+                logger.info(f"已加载增量状态 {location}，共 {len(self.previous)} 个项目")
+                return
+            except ObjectNotFound:
+                continue
+            except Exception as e:
+                logger.warning(f"读取增量状态 {location} 失败: {e}")
+        logger.info(f"最近 {self.lookback_days} 天没有增量状态，将全量处理")
+
+    def match_unchanged(self, repo):
+        """项目自上次运行后没有新的推送、描述和topics也未变化时，返回上次的状态，否则返回None"""
+        entry = self.previous.get(repo.get('full_name'))
+        if not entry or not repo.get('pushed_at') or entry.get('ai_result') is None:
+            return None
+        if (entry['pushed_at'] != repo['pushed_at'] or entry['description'] != repo.get('description')
+                or entry['topics'] != list(repo.get('topics') or [])):
+            return None
+        with self.lock:
+            self.stats['skipped_enrich'] += 1
+        return entry
+
+    def match_content(self, repo):
+        """重新获取详情后，README哈希、描述和标签都未变化时返回上次的AI结果，否则返回None"""
+        entry = self.previous.get(repo.get('full_name'))
+        if not entry or entry.get('ai_result') is None:
+            return None
+        if (entry['readme_hash'] != readme_hash(repo.get('readme')) or entry['description'] != repo.get('description')
+                or entry['all_tags'] != repo.get('all_tags')):
+            return None
+        with self.lock:
+            self.stats['reused_ai'] += 1
+        return entry['ai_result']
+
+    def update(self, repo, ai_result):
+        """记录本次运行的项目状态，AI分析失败时不记录结果，下次运行重新分析"""
+        if not repo.get('full_name'):
+            return
+        entry = {
+            'pushed_at': repo.get('pushed_at'),
+            'updated_at': repo.get('updated_at'),
+            'description': repo.get('description'),
+            'topics': list(repo.get('topics') or []),
+            'all_tags': repo.get('all_tags'),
+            'readme_hash': repo.get('readme_hash') or readme_hash(repo.get('readme')),
+            'ai_result': None if ai_result.get('fallback') else ai_result
+        }
+        with self.lock:
+            self.current[repo['full_name']] = entry
+
+    def save(self, today=None):
+        """保存本次运行的状态（只包含本次处理的项目）"""
+        location = self._location(today or datetime.now())
+        with self.lock:
+            content = json.dumps(self.current, ensure_ascii=False)
+        try:
+            if self.storage is not None:
+                self.storage.put(location, content.encode('utf-8'))
+            else:
+                tmp_path = location + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, location)
+            logger.info(f"已保存增量状态 {location}，共 {len(self.current)} 个项目")
+        except Exception as e:
+            logger.warning(f"保存增量状态失败: {e}")
@@ -5,15 +5,31 @@ import sys
 import time
 import logging
 import json
+import gzip
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # 添加当前目录下的libs文件夹到Python模块搜索路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'libs'))
 
 import requests
 from datetime import datetime, timedelta
-from openai import OpenAI
 import oss2
 
+from ai_cache import AIResultCache
+from ai_client import get_openai_client
+from github_client import get_github_client
+from rate_limit import TokenBucket
+from http_cache import get_http_cache
+from readme_preprocess import ReadmePreprocessor
+from incremental_state import IncrementalState, readme_hash
+from checkpoint import CheckpointJournal
+from stream_writer import OrderedJSONLWriter, jsonl_to_json
+from storage import LocalStorage, create_storage
+from oss_client import pool_size_for
+from manifest import Manifest, MANIFEST_FILENAME
+from oss_retry import RetryPolicy, is_retryable_error
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -36,6 +52,74 @@ OSS_FILE_PATH = ""
 # GitHub 项目筛选配置默认值
 PROJECT_TAG = "all"
 PROJECT_COUNT = 10
+# 多标签模式：一次运行抓取多个标签，每个标签输出一个文件（为空时只抓取PROJECT_TAG）
+PROJECT_TAGS = []
+# 并发获取项目README和标签信息的最大线程数
+ENRICH_CONCURRENCY = 8
+# 是否对GitHub的README/标签请求启用ETag条件请求磁盘缓存
+HTTP_CACHE_ENABLED = True
+# HTTP缓存目录
+HTTP_CACHE_DIR = ".http_cache"
+# HTTP缓存容量上限（MB），超出后按LRU淘汰
+HTTP_CACHE_MAX_MB = 200
+# 是否额外请求项目的Git标签列表（默认仅使用搜索结果中的topics）
+FETCH_REPO_TAGS = False
+# 开启FETCH_REPO_TAGS时每个项目最多获取的Git标签数量
+REPO_TAGS_LIMIT = 10
+# 获取项目README和标签信息的方式："rest"（逐个请求）或 "graphql"（批量查询，需要GH_TOKEN）
+GITHUB_BACKEND = "rest"
+# GraphQL方式下每次查询包含的项目数量（建议20-50）
+GRAPHQL_BATCH_SIZE = 30
+# 并发调用AI分析的最大请求数
+AI_CONCURRENCY = 4
+# AI接口每分钟请求数上限，0表示不限制
+AI_RPM_LIMIT = 60
+# AI分析结果缓存方式："off"（不缓存）、"local"（本地文件）或 "oss"（保存到OSS，便于FC冷启动共享）
+AI_CACHE_MODE = "local"
+# 本地AI结果缓存文件路径
+AI_CACHE_PATH = ".ai_cache.json"
+# AI结果缓存有效期（天）
+AI_CACHE_TTL_DAYS = 7
+# 是否将多个项目合并到一次AI请求中分析
+AI_BATCH_MODE = False
+# 批量分析时每次请求的token预算（含预估输出），据此决定每批项目数量
+AI_BATCH_TOKEN_BUDGET = 6000
+# 是否要求AI接口返回JSON结构化输出（response_format=json_object），接口不支持时可关闭
+AI_JSON_RESPONSE_FORMAT = True
+# AI返回结果不符合格式时单个项目的最大重试次数
+AI_MAX_PARSE_RETRIES = 2
+# 提交给AI的README预处理后的token上限
+README_TOKEN_BUDGET = 500
+# 增量运行："off"、"local"（状态文件保存在本地）或 "oss"（保存到OSS），数据未变化的项目复用上次结果
+INCREMENTAL_MODE = "off"
+# 增量运行时向前查找状态文件的天数
+INCREMENTAL_LOOKBACK_DAYS = 3
+# 是否记录断点日志，中断后重新运行时跳过已完成的项目
+CHECKPOINT_ENABLED = True
+# 断点日志目录（FC中需设置为 /tmp 下的目录）
+CHECKPOINT_DIR = ".checkpoints"
+# 是否边分析边将结果写入同名 .jsonl 文件，最终的 .json 由 .jsonl 生成
+STREAM_OUTPUT = True
+# 上传到OSS的输出格式："none"（原样上传格式化的JSON）或 "gzip"（上传压缩后的紧凑JSON，带Content-Encoding: gzip）
+OUTPUT_COMPRESSION = "none"
+# 批量上传输出文件到OSS的最大并发数
+OSS_UPLOAD_CONCURRENCY = 4
+# OSS上传最多尝试次数（含首次），限流、超时和5xx错误才会重试，鉴权和配置错误立即失败
+OSS_RETRY_MAX_ATTEMPTS = 3
+# OSS重试指数退避的基础等待时间（秒），第n次重试前随机等待 0 ~ 基础时间×2^(n-1) 秒
+OSS_RETRY_BASE_DELAY = 1.0
+# 一次上传中所有OSS重试的总等待预算（秒），用完后不再重试
+OSS_RETRY_BUDGET = 60.0
+# 存储后端："oss" 上传到OSS，"local" 写入LOCAL_STORAGE_DIR目录（离线运行和压测，与OSS走相同的代码路径）
+STORAGE_BACKEND = "oss"
+# 本地存储目录，STORAGE_BACKEND为local时的存储位置，也是OSS上传失败时的替代保存位置
+LOCAL_STORAGE_DIR = "oss_upload_simulator"
+# 上传完成后在存储中维护数据集索引 manifest.json（标签+日期 -> 对象键、大小、CRC64），读取方一次GET即可定位数据
+MANIFEST_ENABLED = True
+# 并发上传的分片数（与upload_csv_to_oss.py共用，用于计算OSS连接池大小）
+MULTIPART_THREADS = 4
+# OSS连接池大小，0表示按 OSS_UPLOAD_CONCURRENCY × MULTIPART_THREADS 自动计算
+OSS_POOL_SIZE = 0
 # 是否在GitHub Actions中尝试实际OSS上传
 GITHUB_ACTIONS_UPLOAD_OSS = False
 
@@ -95,8 +179,76 @@ try:
     # 读取 GitHub 项目筛选配置
     if hasattr(config, 'PROJECT_TAG') and config.PROJECT_TAG:
         PROJECT_TAG = config.PROJECT_TAG
+    if hasattr(config, 'PROJECT_TAGS') and isinstance(config.PROJECT_TAGS, (list, tuple)):
+        PROJECT_TAGS = list(config.PROJECT_TAGS)
     if hasattr(config, 'PROJECT_COUNT') and isinstance(config.PROJECT_COUNT, int):
         PROJECT_COUNT = config.PROJECT_COUNT
+    if hasattr(config, 'ENRICH_CONCURRENCY') and isinstance(config.ENRICH_CONCURRENCY, int):
+        ENRICH_CONCURRENCY = config.ENRICH_CONCURRENCY
+    if hasattr(config, 'HTTP_CACHE_ENABLED'):
+        HTTP_CACHE_ENABLED = bool(config.HTTP_CACHE_ENABLED)
+    if hasattr(config, 'HTTP_CACHE_DIR') and config.HTTP_CACHE_DIR:
+        HTTP_CACHE_DIR = config.HTTP_CACHE_DIR
+    if hasattr(config, 'HTTP_CACHE_MAX_MB') and isinstance(config.HTTP_CACHE_MAX_MB, int):
+        HTTP_CACHE_MAX_MB = config.HTTP_CACHE_MAX_MB
+    if hasattr(config, 'FETCH_REPO_TAGS'):
+        FETCH_REPO_TAGS = bool(config.FETCH_REPO_TAGS)
+    if hasattr(config, 'REPO_TAGS_LIMIT') and isinstance(config.REPO_TAGS_LIMIT, int):
+        REPO_TAGS_LIMIT = config.REPO_TAGS_LIMIT
+    if hasattr(config, 'GITHUB_BACKEND') and config.GITHUB_BACKEND:
+        GITHUB_BACKEND = config.GITHUB_BACKEND
+    if hasattr(config, 'GRAPHQL_BATCH_SIZE') and isinstance(config.GRAPHQL_BATCH_SIZE, int):
+        GRAPHQL_BATCH_SIZE = config.GRAPHQL_BATCH_SIZE
+    if hasattr(config, 'AI_CONCURRENCY') and isinstance(config.AI_CONCURRENCY, int):
+        AI_CONCURRENCY = config.AI_CONCURRENCY
+    if hasattr(config, 'AI_RPM_LIMIT') and isinstance(config.AI_RPM_LIMIT, int):
+        AI_RPM_LIMIT = config.AI_RPM_LIMIT
+    if hasattr(config, 'AI_CACHE_MODE') and config.AI_CACHE_MODE:
+        AI_CACHE_MODE = config.AI_CACHE_MODE
+    if hasattr(config, 'AI_CACHE_PATH') and config.AI_CACHE_PATH:
+        AI_CACHE_PATH = config.AI_CACHE_PATH
+    if hasattr(config, 'AI_CACHE_TTL_DAYS') and isinstance(config.AI_CACHE_TTL_DAYS, int):
+        AI_CACHE_TTL_DAYS = config.AI_CACHE_TTL_DAYS
+    if hasattr(config, 'AI_BATCH_MODE'):
+        AI_BATCH_MODE = bool(config.AI_BATCH_MODE)
+    if hasattr(config, 'AI_BATCH_TOKEN_BUDGET') and isinstance(config.AI_BATCH_TOKEN_BUDGET, int):
+        AI_BATCH_TOKEN_BUDGET = config.AI_BATCH_TOKEN_BUDGET
+    if hasattr(config, 'AI_JSON_RESPONSE_FORMAT'):
+        AI_JSON_RESPONSE_FORMAT = bool(config.AI_JSON_RESPONSE_FORMAT)
+    if hasattr(config, 'AI_MAX_PARSE_RETRIES') and isinstance(config.AI_MAX_PARSE_RETRIES, int):
+        AI_MAX_PARSE_RETRIES = config.AI_MAX_PARSE_RETRIES
+    if hasattr(config, 'README_TOKEN_BUDGET') and isinstance(config.README_TOKEN_BUDGET, int):
+        README_TOKEN_BUDGET = config.README_TOKEN_BUDGET
+    if hasattr(config, 'INCREMENTAL_MODE') and config.INCREMENTAL_MODE:
+        INCREMENTAL_MODE = config.INCREMENTAL_MODE
+    if hasattr(config, 'INCREMENTAL_LOOKBACK_DAYS') and isinstance(config.INCREMENTAL_LOOKBACK_DAYS, int):
+        INCREMENTAL_LOOKBACK_DAYS = config.INCREMENTAL_LOOKBACK_DAYS
+    if hasattr(config, 'CHECKPOINT_ENABLED'):
+        CHECKPOINT_ENABLED = bool(config.CHECKPOINT_ENABLED)
+    if hasattr(config, 'CHECKPOINT_DIR') and config.CHECKPOINT_DIR:
+        CHECKPOINT_DIR = config.CHECKPOINT_DIR
+    if hasattr(config, 'STREAM_OUTPUT'):
+        STREAM_OUTPUT = bool(config.STREAM_OUTPUT)
+    if hasattr(config, 'OUTPUT_COMPRESSION') and config.OUTPUT_COMPRESSION:
+        OUTPUT_COMPRESSION = config.OUTPUT_COMPRESSION
+    if hasattr(config, 'OSS_UPLOAD_CONCURRENCY') and isinstance(config.OSS_UPLOAD_CONCURRENCY, int):
+        OSS_UPLOAD_CONCURRENCY = config.OSS_UPLOAD_CONCURRENCY
+    if hasattr(config, 'OSS_RETRY_MAX_ATTEMPTS') and isinstance(config.OSS_RETRY_MAX_ATTEMPTS, int):
+        OSS_RETRY_MAX_ATTEMPTS = config.OSS_RETRY_MAX_ATTEMPTS
+    if hasattr(config, 'OSS_RETRY_BASE_DELAY') and isinstance(config.OSS_RETRY_BASE_DELAY, (int, float)):
+        OSS_RETRY_BASE_DELAY = config.OSS_RETRY_BASE_DELAY
+    if hasattr(config, 'OSS_RETRY_BUDGET') and isinstance(config.OSS_RETRY_BUDGET, (int, float)):
+        OSS_RETRY_BUDGET = config.OSS_RETRY_BUDGET
+    if hasattr(config, 'STORAGE_BACKEND') and config.STORAGE_BACKEND:
+        STORAGE_BACKEND = config.STORAGE_BACKEND
+    if hasattr(config, 'LOCAL_STORAGE_DIR') and config.LOCAL_STORAGE_DIR:
+        LOCAL_STORAGE_DIR = config.LOCAL_STORAGE_DIR
+    if hasattr(config, 'MANIFEST_ENABLED'):
+        MANIFEST_ENABLED = bool(config.MANIFEST_ENABLED)
+    if hasattr(config, 'MULTIPART_THREADS') and isinstance(config.MULTIPART_THREADS, int):
+        MULTIPART_THREADS = config.MULTIPART_THREADS
+    if hasattr(config, 'OSS_POOL_SIZE') and isinstance(config.OSS_POOL_SIZE, int):
+        OSS_POOL_SIZE = config.OSS_POOL_SIZE
     # 读取GitHub Actions上传控制配置
     if hasattr(config, 'GITHUB_ACTIONS_UPLOAD_OSS'):
         GITHUB_ACTIONS_UPLOAD_OSS = bool(config.GITHUB_ACTIONS_UPLOAD_OSS)
@@ -114,11 +266,104 @@ except ImportError:
     OSS_BUCKET_NAME = os.environ.get('OSS_BUCKET_NAME', OSS_BUCKET_NAME)
     OSS_FILE_PATH = os.environ.get('OSS_FILE_PATH', OSS_FILE_PATH)
     PROJECT_TAG = os.environ.get('PROJECT_TAG', PROJECT_TAG)
+    # 多个标签在环境变量中用英文逗号分隔，如 "ai,web,devops"
+    PROJECT_TAGS = [tag.strip() for tag in os.environ.get('PROJECT_TAGS', '').split(',') if tag.strip()] or PROJECT_TAGS
     # 从环境变量读取整数配置需要转换类型
     try:
         PROJECT_COUNT = int(os.environ.get('PROJECT_COUNT', str(PROJECT_COUNT)))
     except ValueError:
         logger.warning("环境变量中PROJECT_COUNT格式不正确，使用默认值")
+    try:
+        ENRICH_CONCURRENCY = int(os.environ.get('ENRICH_CONCURRENCY', str(ENRICH_CONCURRENCY)))
+    except ValueError:
+        logger.warning("环境变量中ENRICH_CONCURRENCY格式不正确，使用默认值")
+    http_cache_enabled_env = os.environ.get('HTTP_CACHE_ENABLED', str(HTTP_CACHE_ENABLED)).lower()
+    HTTP_CACHE_ENABLED = http_cache_enabled_env in ('true', '1', 'yes')
+    HTTP_CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', HTTP_CACHE_DIR)
+    try:
+        HTTP_CACHE_MAX_MB = int(os.environ.get('HTTP_CACHE_MAX_MB', str(HTTP_CACHE_MAX_MB)))
+    except ValueError:
+        logger.warning("环境变量中HTTP_CACHE_MAX_MB格式不正确，使用默认值")
+    fetch_repo_tags_env = os.environ.get('FETCH_REPO_TAGS', str(FETCH_REPO_TAGS)).lower()
+    FETCH_REPO_TAGS = fetch_repo_tags_env in ('true', '1', 'yes')
+    try:
+        REPO_TAGS_LIMIT = int(os.environ.get('REPO_TAGS_LIMIT', str(REPO_TAGS_LIMIT)))
+    except ValueError:
+        logger.warning("环境变量中REPO_TAGS_LIMIT格式不正确，使用默认值")
+    GITHUB_BACKEND = os.environ.get('GITHUB_BACKEND', GITHUB_BACKEND)
+    try:
+        GRAPHQL_BATCH_SIZE = int(os.environ.get('GRAPHQL_BATCH_SIZE', str(GRAPHQL_BATCH_SIZE)))
+    except ValueError:
+        logger.warning("环境变量中GRAPHQL_BATCH_SIZE格式不正确，使用默认值")
+    try:
+        AI_CONCURRENCY = int(os.environ.get('AI_CONCURRENCY', str(AI_CONCURRENCY)))
+    except ValueError:
+        logger.warning("环境变量中AI_CONCURRENCY格式不正确，使用默认值")
+    try:
+        AI_RPM_LIMIT = int(os.environ.get('AI_RPM_LIMIT', str(AI_RPM_LIMIT)))
+    except ValueError:
+        logger.warning("环境变量中AI_RPM_LIMIT格式不正确，使用默认值")
+    AI_CACHE_MODE = os.environ.get('AI_CACHE_MODE', AI_CACHE_MODE)
+    AI_CACHE_PATH = os.environ.get('AI_CACHE_PATH', AI_CACHE_PATH)
+    try:
+        AI_CACHE_TTL_DAYS = int(os.environ.get('AI_CACHE_TTL_DAYS', str(AI_CACHE_TTL_DAYS)))
+    except ValueError:
+        logger.warning("环境变量中AI_CACHE_TTL_DAYS格式不正确，使用默认值")
+    ai_batch_mode_env = os.environ.get('AI_BATCH_MODE', str(AI_BATCH_MODE)).lower()
+    AI_BATCH_MODE = ai_batch_mode_env in ('true', '1', 'yes')
+    try:
+        AI_BATCH_TOKEN_BUDGET = int(os.environ.get('AI_BATCH_TOKEN_BUDGET', str(AI_BATCH_TOKEN_BUDGET)))
+    except ValueError:
+        logger.warning("环境变量中AI_BATCH_TOKEN_BUDGET格式不正确，使用默认值")
+    ai_json_response_format_env = os.environ.get('AI_JSON_RESPONSE_FORMAT', str(AI_JSON_RESPONSE_FORMAT)).lower()
+    AI_JSON_RESPONSE_FORMAT = ai_json_response_format_env in ('true', '1', 'yes')
+    try:
+        AI_MAX_PARSE_RETRIES = int(os.environ.get('AI_MAX_PARSE_RETRIES', str(AI_MAX_PARSE_RETRIES)))
+    except ValueError:
+        logger.warning("环境变量中AI_MAX_PARSE_RETRIES格式不正确，使用默认值")
+    try:
+        README_TOKEN_BUDGET = int(os.environ.get('README_TOKEN_BUDGET', str(README_TOKEN_BUDGET)))
+    except ValueError:
+        logger.warning("环境变量中README_TOKEN_BUDGET格式不正确，使用默认值")
+    INCREMENTAL_MODE = os.environ.get('INCREMENTAL_MODE', INCREMENTAL_MODE)
+    try:
+        INCREMENTAL_LOOKBACK_DAYS = int(os.environ.get('INCREMENTAL_LOOKBACK_DAYS', str(INCREMENTAL_LOOKBACK_DAYS)))
+    except ValueError:
+        logger.warning("环境变量中INCREMENTAL_LOOKBACK_DAYS格式不正确，使用默认值")
+    checkpoint_enabled_env = os.environ.get('CHECKPOINT_ENABLED', str(CHECKPOINT_ENABLED)).lower()
+    CHECKPOINT_ENABLED = checkpoint_enabled_env in ('true', '1', 'yes')
+    CHECKPOINT_DIR = os.environ.get('CHECKPOINT_DIR', CHECKPOINT_DIR)
+    stream_output_env = os.environ.get('STREAM_OUTPUT', str(STREAM_OUTPUT)).lower()
+    STREAM_OUTPUT = stream_output_env in ('true', '1', 'yes')
+    OUTPUT_COMPRESSION = os.environ.get('OUTPUT_COMPRESSION', OUTPUT_COMPRESSION)
+    try:
+        OSS_UPLOAD_CONCURRENCY = int(os.environ.get('OSS_UPLOAD_CONCURRENCY', str(OSS_UPLOAD_CONCURRENCY)))
+    except ValueError:
+        logger.warning("环境变量中OSS_UPLOAD_CONCURRENCY格式不正确，使用默认值")
+    try:
+        OSS_RETRY_MAX_ATTEMPTS = int(os.environ.get('OSS_RETRY_MAX_ATTEMPTS', str(OSS_RETRY_MAX_ATTEMPTS)))
+    except ValueError:
+        logger.warning("环境变量中OSS_RETRY_MAX_ATTEMPTS格式不正确，使用默认值")
+    try:
+        OSS_RETRY_BASE_DELAY = float(os.environ.get('OSS_RETRY_BASE_DELAY', str(OSS_RETRY_BASE_DELAY)))
+    except ValueError:
+        logger.warning("环境变量中OSS_RETRY_BASE_DELAY格式不正确，使用默认值")
+    try:
+        OSS_RETRY_BUDGET = float(os.environ.get('OSS_RETRY_BUDGET', str(OSS_RETRY_BUDGET)))
+    except ValueError:
+        logger.warning("环境变量中OSS_RETRY_BUDGET格式不正确，使用默认值")
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', STORAGE_BACKEND)
+    LOCAL_STORAGE_DIR = os.environ.get('LOCAL_STORAGE_DIR', LOCAL_STORAGE_DIR)
+    manifest_enabled_env = os.environ.get('MANIFEST_ENABLED', str(MANIFEST_ENABLED)).lower()
+    MANIFEST_ENABLED = manifest_enabled_env in ('true', '1', 'yes')
+    try:
+        MULTIPART_THREADS = int(os.environ.get('MULTIPART_THREADS', str(MULTIPART_THREADS)))
+    except ValueError:
+        logger.warning("环境变量中MULTIPART_THREADS格式不正确，使用默认值")
+    try:
+        OSS_POOL_SIZE = int(os.environ.get('OSS_POOL_SIZE', str(OSS_POOL_SIZE)))
+    except ValueError:
+        logger.warning("环境变量中OSS_POOL_SIZE格式不正确，使用默认值")
     # 从环境变量读取布尔配置
     github_actions_upload_oss_env = os.environ.get('GITHUB_ACTIONS_UPLOAD_OSS', str(GITHUB_ACTIONS_UPLOAD_OSS)).lower()
     GITHUB_ACTIONS_UPLOAD_OSS = github_actions_upload_oss_env in ('true', '1', 'yes')
@@ -135,10 +380,102 @@ except Exception as e:
     OSS_BUCKET_NAME = os.environ.get('OSS_BUCKET_NAME', "")
     OSS_FILE_PATH = os.environ.get('OSS_FILE_PATH', "")
     PROJECT_TAG = os.environ.get('PROJECT_TAG', "all")
+    PROJECT_TAGS = [tag.strip() for tag in os.environ.get('PROJECT_TAGS', '').split(',') if tag.strip()]
     try:
         PROJECT_COUNT = int(os.environ.get('PROJECT_COUNT', "30"))
     except ValueError:
         PROJECT_COUNT = 10
+    try:
+        ENRICH_CONCURRENCY = int(os.environ.get('ENRICH_CONCURRENCY', "8"))
+    except ValueError:
+        ENRICH_CONCURRENCY = 8
+    http_cache_enabled_env = os.environ.get('HTTP_CACHE_ENABLED', 'true').lower()
+    HTTP_CACHE_ENABLED = http_cache_enabled_env in ('true', '1', 'yes')
+    HTTP_CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', ".http_cache")
+    try:
+        HTTP_CACHE_MAX_MB = int(os.environ.get('HTTP_CACHE_MAX_MB', "200"))
+    except ValueError:
+        HTTP_CACHE_MAX_MB = 200
+    fetch_repo_tags_env = os.environ.get('FETCH_REPO_TAGS', 'false').lower()
+    FETCH_REPO_TAGS = fetch_repo_tags_env in ('true', '1', 'yes')
+    try:
+        REPO_TAGS_LIMIT = int(os.environ.get('REPO_TAGS_LIMIT', "10"))
+    except ValueError:
+        REPO_TAGS_LIMIT = 10
+    GITHUB_BACKEND = os.environ.get('GITHUB_BACKEND', "rest")
+    try:
+        GRAPHQL_BATCH_SIZE = int(os.environ.get('GRAPHQL_BATCH_SIZE', "30"))
+    except ValueError:
+        GRAPHQL_BATCH_SIZE = 30
+    try:
+        AI_CONCURRENCY = int(os.environ.get('AI_CONCURRENCY', "4"))
+    except ValueError:
+        AI_CONCURRENCY = 4
+    try:
+        AI_RPM_LIMIT = int(os.environ.get('AI_RPM_LIMIT', "60"))
+    except ValueError:
+        AI_RPM_LIMIT = 60
+    AI_CACHE_MODE = os.environ.get('AI_CACHE_MODE', "local")
+    AI_CACHE_PATH = os.environ.get('AI_CACHE_PATH', ".ai_cache.json")
+    try:
+        AI_CACHE_TTL_DAYS = int(os.environ.get('AI_CACHE_TTL_DAYS', "7"))
+    except ValueError:
+        AI_CACHE_TTL_DAYS = 7
+    ai_batch_mode_env = os.environ.get('AI_BATCH_MODE', 'false').lower()
+    AI_BATCH_MODE = ai_batch_mode_env in ('true', '1', 'yes')
+    try:
+        AI_BATCH_TOKEN_BUDGET = int(os.environ.get('AI_BATCH_TOKEN_BUDGET', "6000"))
+    except ValueError:
+        AI_BATCH_TOKEN_BUDGET = 6000
+    ai_json_response_format_env = os.environ.get('AI_JSON_RESPONSE_FORMAT', 'true').lower()
+    AI_JSON_RESPONSE_FORMAT = ai_json_response_format_env in ('true', '1', 'yes')
+    try:
+        AI_MAX_PARSE_RETRIES = int(os.environ.get('AI_MAX_PARSE_RETRIES', "2"))
+    except ValueError:
+        AI_MAX_PARSE_RETRIES = 2
+    try:
+        README_TOKEN_BUDGET = int(os.environ.get('README_TOKEN_BUDGET', "500"))
+    except ValueError:
+        README_TOKEN_BUDGET = 500
+    INCREMENTAL_MODE = os.environ.get('INCREMENTAL_MODE', "off")
+    try:
+        INCREMENTAL_LOOKBACK_DAYS = int(os.environ.get('INCREMENTAL_LOOKBACK_DAYS', "3"))
+    except ValueError:
+        INCREMENTAL_LOOKBACK_DAYS = 3
+    checkpoint_enabled_env = os.environ.get('CHECKPOINT_ENABLED', 'true').lower()
+    CHECKPOINT_ENABLED = checkpoint_enabled_env in ('true', '1', 'yes')
+    CHECKPOINT_DIR = os.environ.get('CHECKPOINT_DIR', ".checkpoints")
+    stream_output_env = os.environ.get('STREAM_OUTPUT', 'true').lower()
+    STREAM_OUTPUT = stream_output_env in ('true', '1', 'yes')
+    OUTPUT_COMPRESSION = os.environ.get('OUTPUT_COMPRESSION', "none")
+    try:
+        OSS_UPLOAD_CONCURRENCY = int(os.environ.get('OSS_UPLOAD_CONCURRENCY', "4"))
+    except ValueError:
+        OSS_UPLOAD_CONCURRENCY = 4
+    try:
+        OSS_RETRY_MAX_ATTEMPTS = int(os.environ.get('OSS_RETRY_MAX_ATTEMPTS', "3"))
+    except ValueError:
+        OSS_RETRY_MAX_ATTEMPTS = 3
+    try:
+        OSS_RETRY_BASE_DELAY = float(os.environ.get('OSS_RETRY_BASE_DELAY', "1.0"))
+    except ValueError:
+        OSS_RETRY_BASE_DELAY = 1.0
+    try:
+        OSS_RETRY_BUDGET = float(os.environ.get('OSS_RETRY_BUDGET', "60.0"))
+    except ValueError:
+        OSS_RETRY_BUDGET = 60.0
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', "oss")
+    LOCAL_STORAGE_DIR = os.environ.get('LOCAL_STORAGE_DIR', "oss_upload_simulator")
+    manifest_enabled_env = os.environ.get('MANIFEST_ENABLED', 'true').lower()
+    MANIFEST_ENABLED = manifest_enabled_env in ('true', '1', 'yes')
+    try:
+        MULTIPART_THREADS = int(os.environ.get('MULTIPART_THREADS', "4"))
+    except ValueError:
+        MULTIPART_THREADS = 4
+    try:
+        OSS_POOL_SIZE = int(os.environ.get('OSS_POOL_SIZE', "0"))
+    except ValueError:
+        OSS_POOL_SIZE = 0
     # 从环境变量读取布尔配置
     github_actions_upload_oss_env = os.environ.get('GITHUB_ACTIONS_UPLOAD_OSS', 'true').lower()
     GITHUB_ACTIONS_UPLOAD_OSS = github_actions_upload_oss_env in ('true', '1', 'yes')
@@ -146,6 +483,11 @@ except Exception as e:
 # 调试模式
 DEBUG_MODE = True
 
+# 提示词模板版本，修改analyze_with_ai中的提示词时需递增，使旧的AI结果缓存失效
+PROMPT_TEMPLATE_VERSION = 2
+# 批量分析时为每个项目预留的输出token数
+AI_BATCH_OUTPUT_TOKENS_PER_REPO = 150
+
 def validate_and_map_tag(tag):
     """验证标签有效性并进行映射转换"""
     if not tag or tag.lower() == "all":
@@ -167,118 +509,196 @@ def validate_and_map_tag(tag):
     return [tag_lower], tag_lower
 
 # ===========================================
-def get_github_trending():
-    """获取GitHub上的高星项目"""
-    logger.info("正在抓取 GitHub 高星项目数据...")
+def fetch_repo_readme(client, repo):
+    """通过README API获取项目的README，一次请求即可定位默认分支下的README文件（含README.rst等）"""
+    try:
+        readme, status_code = client.get_readme(repo['full_name'])
+        if readme is not None:
+            repo['readme'] = readme['text']
+        elif status_code == 403 and not GH_TOKEN:
+            # 如果是未认证导致的访问限制，记录警告
+            logger.warning(f"获取README时达到API限制，建议提供GitHub Token以增加访问配额")
+            repo['readme'] = "README访问受限"
+        else:
+            repo['readme'] = "README not available"
+    except Exception as e:
+        logger.warning(f"获取README失败: {e}")
+        repo['readme'] = "README获取失败"
+
+def fetch_repo_details(client, repo):
+    """获取单个项目的README和标签信息"""
+    logger.info(f"正在获取 {repo['name']} 的README和标签信息...")
     
-    url = "https://api.github.com/search/repositories"
+    fetch_repo_readme(client, repo)
     
-    # 构建请求头
-    headers = {
-        "Accept": "application/vnd.github.v3+json"
-    }
+    # 标签直接使用搜索结果中自带的topics，无需额外请求
+    repo['all_tags'] = list(repo.get('topics') or [])
     
-    # 如果提供了GitHub Token，则添加到请求头中
-    if GH_TOKEN:
-        headers["Authorization"] = f"token {GH_TOKEN}"
-        logger.info("已使用GitHub Token进行认证，将获得更高的API调用限额")
-    else:
-        logger.warning("未提供GitHub Token，将使用未认证请求，可能会受到API调用频率限制")
+    # 仅在开启FETCH_REPO_TAGS时请求Git标签列表，并限制获取数量
+    if FETCH_REPO_TAGS:
+        try:
+            tags_url = f"https://api.github.com/repos/{repo['full_name']}/tags"
+            tags_response = client.get(tags_url, params={'per_page': max(1, min(REPO_TAGS_LIMIT, 100))})
+            if tags_response.status_code == 200:
+                repo['all_tags'] += [tag['name'] for tag in tags_response.json() if tag['name'] not in repo['all_tags']]
+            elif tags_response.status_code == 403 and not GH_TOKEN:
+                # 如果是未认证导致的访问限制，记录警告
+                logger.warning(f"获取标签时达到API限制，建议提供GitHub Token以增加访问配额")
+            else:
+                logger.warning(f"获取标签失败，状态码: {tags_response.status_code}")
+        except Exception as e:
+            logger.warning(f"获取标签失败: {e}")
     
-    # 搜索条件：高星项目，按 Star 排序
-    # 根据配置的标签和数量筛选项目
-    query = "stars:>5000"
+    return repo
+
+def fetch_repo_batch_details(client, repos):
+    """通过一次GraphQL查询批量获取一批项目的README和标签信息，失败时退回REST逐个获取"""
+    logger.info(f"正在通过GraphQL批量获取 {len(repos)} 个项目的README和标签信息...")
+    try:
+        details = client.fetch_repos_graphql(
+            [repo['full_name'] for repo in repos],
+            tags_limit=max(1, min(REPO_TAGS_LIMIT, 100)) if FETCH_REPO_TAGS else 0
+        )
+    except Exception as e:
+        logger.warning(f"GraphQL批量获取失败: {e}")
+        details = None
+    if details is None:
+        logger.warning("GraphQL批量获取失败，改用REST逐个获取")
+        return [fetch_repo_details(client, repo) for repo in repos]
     
-    mapped_topics, used_tag = validate_and_map_tag(PROJECT_TAG)
+    for repo in repos:
+        detail = details.get(repo['full_name'])
+        if detail is None:
+            fetch_repo_details(client, repo)
+            continue
+        if detail['readme'] is not None:
+            repo['readme'] = detail['readme']
+        else:
+            # 固定的几个文件名都不存在（如README.markdown、docs/README.md），由README API定位
+            fetch_repo_readme(client, repo)
+        repo['all_tags'] = detail['topics'] + [tag for tag in detail['tags'] if tag not in detail['topics']]
+        if detail['default_branch']:
+            repo['default_branch'] = detail['default_branch']
+    return repos
+
+def build_search_query(tag):
+    """根据标签构造搜索条件（Star下限由search_repositories按区间添加）"""
+    query = ""
+    
+    mapped_topics, used_tag = validate_and_map_tag(tag)
     # 如果指定了标签，则添加到搜索条件中
     if used_tag and used_tag.lower() != "all":
         if len(mapped_topics) > 1:
             # 如果有多个标签映射，使用OR逻辑组合
             topic_conditions = " ".join([f"topic:{topic}" for topic in mapped_topics])
-            query += f" (" + topic_conditions + ")"
+            query += f"(" + topic_conditions + ")"
             logger.info(f"使用多标签筛选项目: {', '.join(mapped_topics)}")
         else:
-            query += f" topic:{mapped_topics[0]}"
+            query += f"topic:{mapped_topics[0]}"
             logger.info(f"使用标签筛选项目: {mapped_topics[0]}")
     else:
         logger.info("获取全类型项目")
+    return query
+
+def get_github_trending(tags=None):
+    """获取GitHub上的高星项目，返回 {标签: 项目列表}
+
+    多个标签的搜索并发执行，同时出现在多个标签下的项目按 full_name 去重，只获取一次详情（各标签共享同一个项目字典）。
+    """
+    tags = tags or [PROJECT_TAG]
+    logger.info(f"正在抓取 GitHub 高星项目数据，标签: {', '.join(tags)}...")
+    
+    # 使用共享的GitHub客户端，根据响应头中的限额信息自动限速
+    # 启用缓存时README和标签请求改为条件请求，未变化的内容直接使用本地缓存
+    http_cache = get_http_cache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_MB) if HTTP_CACHE_ENABLED else None
+    client = get_github_client(GH_TOKEN, pool_size=ENRICH_CONCURRENCY, cache=http_cache)
+    if GH_TOKEN:
+        logger.info("已使用GitHub Token进行认证，将获得更高的API调用限额")
+    else:
+        logger.warning("未提供GitHub Token，将使用未认证请求，可能会受到API调用频率限制")
+    
+    # 搜索条件：高星项目（stars>5000），按 Star 排序
+    # 根据配置的标签和数量筛选项目
+    queries = {tag: build_search_query(tag) for tag in tags}
     
     # 确定获取数量
     project_count = 3 if DEBUG_MODE else PROJECT_COUNT
-    logger.info(f"计划获取项目数量: {project_count}")
-    
-    params = {
-        "q": query,
-        "sort": "stars",
-        "order": "desc",
-        "per_page": project_count
-    }
+    logger.info(f"计划获取项目数量: 每个标签 {project_count} 个")
     
     try:
-        # 使用 session 来确保正确处理编码
-        session = requests.Session()
-        # 解决Unicode编码问题
-        encoded_headers = {k: v.encode('ascii', 'ignore').decode('ascii') for k, v in headers.items()}
-        response = session.get(url, headers=encoded_headers, params=params)
-        if response.status_code != 200:
-            logger.error(f"GitHub API Error: {response.text}")
-            return []
+        use_graphql = GITHUB_BACKEND.lower() == 'graphql'
+        if use_graphql and not GH_TOKEN:
+            logger.warning("GraphQL API需要GitHub Token认证，改用REST方式获取项目详情")
+            use_graphql = False
         
-        repos = response.json().get('items', [])
+        # 边分页搜索边并发获取README和标签信息：第1页的项目在第2页加载时已开始处理
+        max_workers = max(1, min(ENRICH_CONCURRENCY, project_count * len(tags)))
+        logger.info(f"并发获取项目README和标签信息，方式: {'GraphQL' if use_graphql else 'REST'}，并发数: {max_workers}")
+        # 上次运行中断前已完成的项目、以及增量模式下自上次运行后未变化的项目不再获取详情，直接复用结果
+        checkpoint_journal = get_checkpoint_journal()
+        incremental_state = get_incremental_state()
+        tag_repos = {tag: [] for tag in tags}
+        unique_repos = {}
+        futures = []
+        batch = []
+        lock = threading.Lock()
+        batch_size = max(1, GRAPHQL_BATCH_SIZE)
         
-        # 获取每个项目的README和完整标签信息
-        for i, repo in enumerate(repos):
-            logger.info(f"正在获取 {repo['name']} 的README和标签信息...")
-            
-            # 获取README
-            readme_url = f"https://raw.githubusercontent.com/{repo['full_name']}/master/README.md"
-            try:
-                # 使用相同的认证头获取README
-                readme_response = session.get(readme_url, headers=encoded_headers)
-                if readme_response.status_code == 200:
-                    repo['readme'] = readme_response.text
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            def enqueue(repo):
+                """提交新项目的详情获取任务（调用方需持有锁）"""
+                restored_result = checkpoint_journal.restore(repo) if checkpoint_journal is not None else None
+                if restored_result is not None:
+                    repo['previous_ai_result'] = restored_result
+                    repo['checkpointed'] = True
+                    return
+                previous = incremental_state.match_unchanged(repo) if incremental_state is not None else None
+                if previous is not None:
+                    repo['all_tags'] = previous['all_tags']
+                    repo['readme_hash'] = previous['readme_hash']
+                    repo['previous_ai_result'] = previous['ai_result']
+                elif not use_graphql:
+                    futures.append(executor.submit(fetch_repo_details, client, repo))
                 else:
-                    # 尝试其他分支
-                    readme_url = f"https://raw.githubusercontent.com/{repo['full_name']}/main/README.md"
-                    readme_response = session.get(readme_url, headers=encoded_headers)
-                    if readme_response.status_code == 200:
-                        repo['readme'] = readme_response.text
-                    elif readme_response.status_code == 403 and not GH_TOKEN:
-                        # 如果是未认证导致的访问限制，记录警告
-                        logger.warning(f"获取README时达到API限制，建议提供GitHub Token以增加访问配额")
-                        repo['readme'] = "README访问受限"
-                    else:
-                        repo['readme'] = "README not available"
-            except Exception as e:
-                logger.warning(f"获取README失败: {e}")
-                repo['readme'] = "README获取失败"
+                    batch.append(repo)
+                    if len(batch) >= batch_size:
+                        futures.append(executor.submit(fetch_repo_batch_details, client, list(batch)))
+                        batch.clear()
             
-            # 获取完整标签列表
-            try:
-                tags_url = f"https://api.github.com/repos/{repo['full_name']}/tags"
-                # 使用相同的认证头获取标签信息
-                tags_response = session.get(tags_url, headers=encoded_headers)
-                if tags_response.status_code == 200:
-                    repo['all_tags'] = [tag['name'] for tag in tags_response.json()]
-                elif tags_response.status_code == 403 and not GH_TOKEN:
-                    # 如果是未认证导致的访问限制，记录警告
-                    logger.warning(f"获取标签时达到API限制，建议提供GitHub Token以增加访问配额")
-                    repo['all_tags'] = []
-                else:
-                    logger.warning(f"获取标签失败，状态码: {tags_response.status_code}")
-                    repo['all_tags'] = []
-            except Exception as e:
-                logger.warning(f"获取标签失败: {e}")
-                repo['all_tags'] = repo.get('topics', [])
+            def search(tag):
+                for repo in client.search_repositories(queries[tag], project_count, min_stars=5000):
+                    # 详情获取会原地更新repo，结果顺序与搜索结果保持一致
+                    with lock:
+                        existing = unique_repos.get(repo['full_name'])
+                        if existing is not None:
+                            tag_repos[tag].append(existing)
+                            continue
+                        unique_repos[repo['full_name']] = repo
+                        tag_repos[tag].append(repo)
+                        enqueue(repo)
             
-            # 避免 API 速率限制
-            time.sleep(1)
+            with ThreadPoolExecutor(max_workers=len(tags)) as search_executor:
+                list(search_executor.map(search, tags))
+            if batch:
+                futures.append(executor.submit(fetch_repo_batch_details, client, list(batch)))
+            for future in futures:
+                future.result()
+        
+        if len(tags) > 1:
+            total = sum(len(repos) for repos in tag_repos.values())
+            logger.info(f"多标签搜索共 {total} 个结果，去重后 {len(unique_repos)} 个项目")
+        if checkpoint_journal is not None and checkpoint_journal.stats['restored']:
+            logger.info(f"断点恢复：{checkpoint_journal.stats['restored']} 个项目已在上次运行中完成，跳过处理")
+        if incremental_state is not None:
+            logger.info(f"增量模式：{incremental_state.stats['skipped_enrich']} 个项目未变化，跳过详情获取")
+        if client.cache is not None:
+            client.cache.save()
         
-        return repos
+        return tag_repos
     except requests.exceptions.RequestException as e:
         logger.error(f"GitHub 请求异常: {e}")
         # 提供备用数据用于测试
-        return [
+        mock_repos = [
             {
                 'name': 'react',
                 'description': 'A declarative, efficient, and flexible JavaScript library for building user interfaces.',
@@ -307,65 +727,229 @@ def get_github_trending():
                 'all_tags': ['kubernetes', 'containers', 'docker', 'devops', 'cloud']
             }
         ]
+        return {tag: mock_repos for tag in tags}
     except Exception as e:
         logger.error(f"GitHub 其他异常: {e}")
         import traceback
         traceback.print_exc()
-        return []
+        return {}
+
+_readme_preprocessor = None
+
+def get_readme_preprocessor():
+    """获取进程内共享的README预处理器（按AI_MODEL选择分词器）"""
+    global _readme_preprocessor
+    if _readme_preprocessor is None:
+        _readme_preprocessor = ReadmePreprocessor(README_TOKEN_BUDGET, model=AI_MODEL)
+    return _readme_preprocessor
+
+def get_project_tags():
+    """本次运行要抓取的标签列表：配置了PROJECT_TAGS时使用多标签模式，否则只抓取PROJECT_TAG"""
+    tags = []
+    for tag in PROJECT_TAGS or [PROJECT_TAG]:
+        if tag not in tags:
+            tags.append(tag)
+    return tags
+
+def get_type_prefix(tag):
+    """输出文件名的类型前缀"""
+    return tag.lower() if tag and tag.lower() != "all" else "all"
+
+def get_run_prefix():
+    """增量状态文件名的前缀：单标签时与输出文件一致，多标签时所有标签共用一个状态文件"""
+    tags = get_project_tags()
+    return get_type_prefix(tags[0]) if len(tags) == 1 else "multi"
+
+def get_storage():
+    """按STORAGE_BACKEND获取存储（OSS复用进程内共享的Bucket连接池，或本地目录），OSS配置不完整时返回None"""
+    pool_size = OSS_POOL_SIZE or pool_size_for(OSS_UPLOAD_CONCURRENCY, MULTIPART_THREADS)
+    return create_storage(STORAGE_BACKEND, LOCAL_STORAGE_DIR, OSS_ACCESS_KEY_ID, OSS_ACCESS_KEY_SECRET,
+                          OSS_ENDPOINT, OSS_BUCKET_NAME, pool_size=pool_size)
+
+def get_oss_directory():
+    """OSS中的存储目录（以/结尾），未配置时为空字符串"""
+    return OSS_FILE_PATH.rstrip('/') + '/' if OSS_FILE_PATH else ''
 
-def analyze_with_ai(repo):
+_incremental_state = None
+_incremental_state_loaded = False
+
+def get_incremental_state():
+    """按INCREMENTAL_MODE创建并加载增量运行状态（每次运行只加载一次），未启用时返回None"""
+    global _incremental_state, _incremental_state_loaded
+    if _incremental_state_loaded:
+        return _incremental_state
+    _incremental_state_loaded = True
+    
+    mode = (INCREMENTAL_MODE or "off").lower()
+    if mode == "local":
+        _incremental_state = IncrementalState(get_run_prefix(), lookback_days=INCREMENTAL_LOOKBACK_DAYS)
+    elif mode == "oss":
+        storage = get_storage()
+        if storage is None:
+            logger.warning("OSS配置不完整，增量状态改用本地文件")
+            _incremental_state = IncrementalState(get_run_prefix(), lookback_days=INCREMENTAL_LOOKBACK_DAYS)
+        else:
+            _incremental_state = IncrementalState(get_run_prefix(), directory=get_oss_directory() + "state/",
+                                                  storage=storage, lookback_days=INCREMENTAL_LOOKBACK_DAYS)
+    else:
+        return None
+    
+    _incremental_state.load()
+    return _incremental_state
+
+_checkpoint_journal = None
+_checkpoint_journal_loaded = False
+
+def get_checkpoint_journal():
+    """创建并加载本次运行的断点日志（每次运行只加载一次），未启用时返回None"""
+    global _checkpoint_journal, _checkpoint_journal_loaded
+    if _checkpoint_journal_loaded:
+        return _checkpoint_journal
+    _checkpoint_journal_loaded = True
+    if not CHECKPOINT_ENABLED:
+        return None
+    
+    path = os.path.join(CHECKPOINT_DIR, f"{get_run_prefix()}_checkpoint_{datetime.now().strftime('%Y%m%d')}.jsonl")
+    _checkpoint_journal = CheckpointJournal(path)
+    try:
+        _checkpoint_journal.load()
+    except OSError as e:
+        logger.warning(f"读取断点日志失败，将从头开始: {e}")
+    return _checkpoint_journal
+
+def reset_run_state():
+    """每次运行开始时重置进程内的运行状态
+
+    函数计算FC的热启动会在同一进程中多次调用 main()，断点日志（路径中的日期）必须按本次运行重新创建和加载，
+    否则上一次运行已完成的项目会被还原，跳过README获取和AI分析；增量状态需要重新读取上次运行的快照，
+    AI结果缓存和README预处理的统计只计入本次运行。
+    """
+    global _checkpoint_journal, _checkpoint_journal_loaded
+    global _incremental_state, _incremental_state_loaded, _ai_result_cache, _ai_result_cache_loaded
+    global _readme_preprocessor
+    _checkpoint_journal = None
+    _checkpoint_journal_loaded = False
+    _incremental_state = None
+    _incremental_state_loaded = False
+    _ai_result_cache = None
+    _ai_result_cache_loaded = False
+    _readme_preprocessor = None
+
+def record_checkpoint(repo, ai_result):
+    """项目完成后立即写入断点日志"""
+    if _checkpoint_journal is not None and ai_result is not None and not repo.get('checkpointed'):
+        _checkpoint_journal.record(repo, ai_result)
+
+_ai_result_cache = None
+_ai_result_cache_loaded = False
+
+def get_ai_result_cache():
+    """按AI_CACHE_MODE创建并加载AI结果缓存（每次运行只加载一次），未启用时返回None"""
+    global _ai_result_cache, _ai_result_cache_loaded
+    if _ai_result_cache_loaded:
+        return _ai_result_cache
+    _ai_result_cache_loaded = True
+    
+    mode = (AI_CACHE_MODE or "off").lower()
+    ttl_seconds = AI_CACHE_TTL_DAYS * 24 * 3600
+    if mode == "local":
+        _ai_result_cache = AIResultCache(ttl_seconds, path=AI_CACHE_PATH)
+    elif mode == "oss":
+        storage = get_storage()
+        if storage is None:
+            logger.warning("OSS配置不完整，AI结果缓存改用本地文件")
+            _ai_result_cache = AIResultCache(ttl_seconds, path=AI_CACHE_PATH)
+        else:
+            _ai_result_cache = AIResultCache(ttl_seconds, storage=storage, oss_key=get_oss_directory() + "cache/ai_results.json")
+    else:
+        return None
+    
+    _ai_result_cache.load()
+    return _ai_result_cache
+
+# AI可选择的项目分类
+AI_CATEGORIES = [
+    "开源框架/库（Frameworks & Libraries）",
+    "开发者工具（Developer Tools）",
+    "实用工具/脚本（Utilities/Scripts）",
+    "教育/学习资源（Education/Resources）",
+    "AI",
+    "社区/文化项目（Community/Culture）",
+    "游戏/图形（Games/Graphics）",
+    "科学计算/人工智能（Science/AI）",
+    "移动应用/嵌入式（Mobile/Embedded）",
+    "企业级应用（Enterprise）",
+    "基础设施/DevOps（Infrastructure/DevOps）"
+]
+
+def prepare_ai_input(repo):
+    """整理提交给AI的项目信息（预处理README），并计算对应的缓存键"""
+    repo_desc = repo['description'] or "无描述"
+    tags = ', '.join(repo['all_tags']) if repo['all_tags'] else "无标签"
+    
+    # 去掉徽章、HTML、代码块等无语义内容，并限制在token预算内
+    readme = repo['readme'] and get_readme_preprocessor().process(repo['readme'])
+    readme = readme or "无README"
+    
+    return {
+        'name': repo['name'],
+        'full_name': repo.get('full_name') or repo['name'],
+        'url': repo['html_url'],
+        'description': repo_desc,
+        'stars': repo['stargazers_count'],
+        'readme': readme,
+        'tags': tags,
+        'cache_key': AIResultCache.make_key(AI_MODEL, PROMPT_TEMPLATE_VERSION, repo['name'], repo_desc, readme, tags)
+    }
+
+def analyze_with_ai(repo, rate_limiter=None):
     """调用 AI 进行多标签分类和README概括"""
     try:
-        client = OpenAI(api_key=AI_API_KEY, base_url=AI_BASE_URL)
-        
-        repo_name = repo['name']
-        repo_desc = repo['description'] or "无描述"
-        repo_url = repo['html_url']
-        stars = repo['stargazers_count']
-        readme = repo['readme'] or "无README"
-        tags = ', '.join(repo['all_tags']) if repo['all_tags'] else "无标签"
+        # 复用进程内共享的客户端，连接池大小与AI并发数匹配
+        client = get_openai_client(AI_API_KEY, AI_BASE_URL, max_connections=max(1, AI_CONCURRENCY))
         
+        ai_input = prepare_ai_input(repo)
+        repo_name = ai_input['name']
         logger.info(f"正在分析: {repo_name}...")
         
-        # 限制README长度以避免超过token限制
-        max_readme_length = 2000
-        if len(readme) > max_readme_length:
-            readme = readme[:max_readme_length] + "\n... (内容过长，已截断)"
+        # 项目信息与上次分析时一致则直接复用缓存结果
+        ai_cache = get_ai_result_cache()
+        if ai_cache is not None:
+            cached_result = ai_cache.get(ai_input['cache_key'])
+            if cached_result is not None:
+                logger.info(f"使用缓存的AI分析结果: {repo_name}")
+                return cached_result
         
+        categories = "\n        ".join(AI_CATEGORIES)
         prompt = f"""
         我是一个 GitHub 聚合网站的编辑。请根据以下项目信息，帮我进行多标签分类并概括README内容。
         
         项目名称: {repo_name}
-        项目链接: {repo_url}
-        原始描述: {repo_desc}
-        Star数: {stars}
-        标签: {tags}
-        README内容: {readme}
+        项目链接: {ai_input['url']}
+        原始描述: {ai_input['description']}
+        Star数: {ai_input['stars']}
+        标签: {ai_input['tags']}
+        README内容: {ai_input['readme']}
         
         请从以下分类中选择适合该项目的所有标签（可以选择多个）：
-        开源框架/库（Frameworks & Libraries）
-        开发者工具（Developer Tools）
-        实用工具/脚本（Utilities/Scripts）
-        教育/学习资源（Education/Resources）
-        AI
-        社区/文化项目（Community/Culture）
-        游戏/图形（Games/Graphics）
-        科学计算/人工智能（Science/AI）
-        移动应用/嵌入式（Mobile/Embedded）
-        企业级应用（Enterprise）
-        基础设施/DevOps（Infrastructure/DevOps）
-        
-        请严格执行以下格式返回（不要多余废话）：
-        标签: [标签1, 标签2, ...]  # 使用英文逗号分隔，保留中文标签名称
-        README概括: [将README内容概括为1-2句话，用中文表达]
+        {categories}
+        
+        请严格按以下JSON格式返回，不要返回JSON以外的任何内容：
+        {{"tags": ["标签1", "标签2"], "summary": "将README内容概括为1-2句话，用中文表达"}}
+        其中 tags 使用上面列出的中文分类名称。
         """
         
-        completion = client.chat.completions.create(
-            model=AI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7
-        )
-        return completion.choices[0].message.content
+        # 返回内容不符合格式时只重试当前项目
+        for attempt in range(AI_MAX_PARSE_RETRIES + 1):
+            content = request_ai_completion(client, prompt, rate_limiter)
+            ai_result = parse_ai_result(content)
+            if ai_result is not None:
+                if ai_cache is not None:
+                    ai_cache.set(ai_input['cache_key'], ai_result)
+                return ai_result
+            if attempt < AI_MAX_PARSE_RETRIES:
+                logger.warning(f"AI返回格式不正确，重试分析 {repo_name} ({attempt+1}/{AI_MAX_PARSE_RETRIES})")
+        raise ValueError(f"AI多次返回格式不正确的结果: {content[:200] if content else content}")
     except Exception as e:
         logger.error(f"AI Error: {e}")
         # 根据项目信息手动分配一个合理的标签
@@ -385,7 +969,249 @@ def analyze_with_ai(repo):
         else:
             readme_summary = "无法概括README内容（AI概括失败）"
         
-        return f"标签: {', '.join(tags)}\nREADME概括: {readme_summary}"
+        # 标记为兜底结果，增量状态不会保存该结果
+        return {"tags": tags, "summary": readme_summary, "fallback": True}
+
+def request_ai_completion(client, prompt, rate_limiter=None):
+    """在请求频率限制内发送一次对话请求，返回回复内容"""
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    request_args = {
+        "model": AI_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.7
+    }
+    if AI_JSON_RESPONSE_FORMAT:
+        request_args["response_format"] = {"type": "json_object"}
+    completion = client.chat.completions.create(**request_args)
+    return completion.choices[0].message.content or ""
+
+def extract_json(content, open_char, close_char):
+    """从回复中截取第一个 open_char 到最后一个 close_char 之间的JSON（兼容带```json代码块的回复），解析失败时返回None"""
+    start = content.find(open_char)
+    end = content.rfind(close_char)
+    if start == -1 or end <= start:
+        return None
+    try:
+        return json.loads(content[start:end + 1])
+    except ValueError:
+        return None
+
+def validate_ai_result(item):
+    """校验单个项目的分析结果：tags 为非空字符串列表，summary 为非空字符串
+
+    合格时返回 {"tags": [...], "summary": "..."}，否则返回None。
+    """
+    if not isinstance(item, dict):
+        return None
+    tags = item.get('tags')
+    summary = item.get('summary')
+    if not isinstance(tags, list) or not tags or not all(isinstance(tag, str) and tag.strip() for tag in tags):
+        return None
+    if not isinstance(summary, str) or not summary.strip():
+        return None
+    return {"tags": [tag.strip() for tag in tags], "summary": summary.strip()}
+
+def parse_ai_result(content):
+    """解析单个项目分析返回的JSON对象，格式不正确时返回None"""
+    return validate_ai_result(extract_json(content or "", '{', '}'))
+
+def build_project_record(repo, ai_result):
+    """将结构化的AI分析结果转换为输出的项目记录"""
+    return {
+        "项目标签": ', '.join(ai_result['tags']),
+        "项目名称": repo['name'],
+        "项目地址": repo['html_url'],
+        "项目README": ai_result['summary']
+    }
+
+def render_batch_item(ai_input):
+    """批量提示词中单个项目的信息"""
+    return f"""
+### {ai_input['full_name']}
+项目链接: {ai_input['url']}
+原始描述: {ai_input['description']}
+Star数: {ai_input['stars']}
+标签: {ai_input['tags']}
+README内容: {ai_input['readme']}
+"""
+
+def build_batch_prompt(ai_inputs):
+    """构造一次分析多个项目的提示词，分类列表和格式说明只出现一次"""
+    categories = "\n".join(AI_CATEGORIES)
+    items = "".join(render_batch_item(ai_input) for ai_input in ai_inputs)
+    return f"""我是一个 GitHub 聚合网站的编辑。请根据以下多个项目的信息，分别为每个项目进行多标签分类并概括README内容。
+
+请从以下分类中为每个项目选择适合的所有标签（可以选择多个）：
+{categories}
+
+项目列表（每个项目以 ### 加项目全名开头）：
+{items}
+请严格按以下JSON格式返回，results 中每个项目对应一个元素，不要返回JSON以外的任何内容：
+{{"results": [{{"name": "项目全名（与 ### 后的名称完全一致）", "tags": ["标签1", "标签2"], "summary": "将README内容概括为1-2句话，用中文表达"}}]}}
+其中 tags 使用上面列出的中文分类名称。
+"""
+
+def split_into_batches(pending, token_budget):
+    """按token预算将待分析项目 [(序号, ai_input)] 分组，每组至少包含一个项目"""
+    count_tokens = get_readme_preprocessor().counter.count
+    base_tokens = count_tokens(build_batch_prompt([]))
+    batches = []
+    current = []
+    current_tokens = base_tokens
+    for index, ai_input in pending:
+        tokens = count_tokens(render_batch_item(ai_input)) + AI_BATCH_OUTPUT_TOKENS_PER_REPO
+        if current and current_tokens + tokens > token_budget:
+            batches.append(current)
+            current = []
+            current_tokens = base_tokens
+        current.append((index, ai_input))
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def parse_batch_result(content, ai_inputs):
+    """解析批量分析返回的JSON，返回 {项目全名: 结构化结果}，缺失或格式不正确的项目不会出现在结果中"""
+    data = extract_json(content, '{', '}')
+    items = data.get('results') if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        # 兼容直接返回JSON数组的回复
+        items = extract_json(content, '[', ']')
+    if not isinstance(items, list):
+        return {}
+    
+    expected_names = {ai_input['full_name'] for ai_input in ai_inputs}
+    results = {}
+    for item in items:
+        ai_result = validate_ai_result(item)
+        if ai_result is not None and item.get('name') in expected_names:
+            results[item['name']] = ai_result
+    return results
+
+def analyze_batch_with_ai(ai_inputs, rate_limiter=None):
+    """用一次请求分析一批项目，返回 {项目全名: 结构化结果}；请求失败时返回空字典"""
+    try:
+        client = get_openai_client(AI_API_KEY, AI_BASE_URL, max_connections=max(1, AI_CONCURRENCY))
+        logger.info(f"正在批量分析 {len(ai_inputs)} 个项目: {', '.join(ai_input['name'] for ai_input in ai_inputs)}")
+        
+        content = request_ai_completion(client, build_batch_prompt(ai_inputs), rate_limiter)
+        parsed = parse_batch_result(content, ai_inputs)
+    except Exception as e:
+        logger.error(f"AI批量分析失败: {e}")
+        return {}
+    
+    ai_cache = get_ai_result_cache()
+    results = {}
+    for ai_input in ai_inputs:
+        if ai_input['full_name'] not in parsed:
+            continue
+        ai_result = parsed[ai_input['full_name']]
+        if ai_cache is not None:
+            ai_cache.set(ai_input['cache_key'], ai_result)
+        results[ai_input['full_name']] = ai_result
+    
+    missing_count = len(ai_inputs) - len(results)
+    if missing_count:
+        logger.warning(f"批量分析中有 {missing_count} 个项目缺失或格式不正确，将单独重试")
+    return results
+
+def analyze_repos_in_batches(repos, ai_results, executor, rate_limiter, on_result=None):
+    """按token预算分组批量分析ai_results中尚无结果的项目，结果写回ai_results，未得到有效结果的位置仍为None
+
+    每得到一个有效结果即调用 on_result(序号, 结果)。
+    """
+    ai_cache = get_ai_result_cache()
+    pending = []
+    for index, repo in enumerate(repos):
+        if ai_results[index] is not None:
+            continue
+        ai_input = prepare_ai_input(repo)
+        cached_result = ai_cache.get(ai_input['cache_key']) if ai_cache is not None else None
+        if cached_result is not None:
+            logger.info(f"使用缓存的AI分析结果: {ai_input['name']}")
+            ai_results[index] = cached_result
+            if on_result is not None:
+                on_result(index, cached_result)
+        else:
+            pending.append((index, ai_input))
+    
+    batches = split_into_batches(pending, AI_BATCH_TOKEN_BUDGET)
+    logger.info(f"批量分析模式：{len(pending)} 个项目分为 {len(batches)} 组，token预算: {AI_BATCH_TOKEN_BUDGET}")
+    futures = [
+        (batch, executor.submit(analyze_batch_with_ai, [ai_input for _, ai_input in batch], rate_limiter))
+        for batch in batches
+    ]
+    for batch, future in futures:
+        batch_results = future.result()
+        for index, ai_input in batch:
+            ai_results[index] = batch_results.get(ai_input['full_name'])
+            if ai_results[index] is not None and on_result is not None:
+                on_result(index, ai_results[index])
+
+# 流式输出模式下已完成项目在结果列表中的占位，结果本身已写出，不再保留
+STREAMED = object()
+
+def analyze_repos(repos, on_record=None):
+    """并发调用AI分析项目，结果按原始（Star）顺序返回
+
+    每个项目完成后立即写入断点日志，并调用 on_record(序号, 项目记录)（完成顺序不保证与原始顺序一致）。
+    传入 on_record（流式输出）时不再保留结果：项目完成后立即更新增量状态并释放README原文和AI结果，返回None，
+    内存占用不随项目数增长。
+    """
+    # 令牌桶按每分钟请求数补充，允许各工作线程同时发出第一批请求
+    rate_limiter = TokenBucket(AI_RPM_LIMIT / 60.0, max(1, AI_CONCURRENCY)) if AI_RPM_LIMIT > 0 else None
+    max_workers = max(1, min(AI_CONCURRENCY, len(repos)))
+    logger.info(f"并发调用AI分析项目，并发数: {max_workers}，每分钟请求上限: {AI_RPM_LIMIT if AI_RPM_LIMIT > 0 else '不限'}")
+    streaming = on_record is not None
+    incremental_state = get_incremental_state()
+    
+    def complete(index, ai_result):
+        repo = repos[index]
+        record_checkpoint(repo, ai_result)
+        if not streaming:
+            return ai_result
+        on_record(index, build_project_record(repo, ai_result))
+        # 结果已写入断点日志和流式文件，此后只需要README的哈希
+        if incremental_state is not None:
+            incremental_state.update(repo, ai_result)
+        repo.setdefault('readme_hash', readme_hash(repo.get('readme')))
+        repo.pop('readme', None)
+        repo.pop('previous_ai_result', None)
+        ai_results[index] = STREAMED
+        return STREAMED
+    
+    def analyze_and_complete(index):
+        return complete(index, analyze_with_ai(repos[index], rate_limiter))
+    
+    # 增量模式下复用未变化项目上次的分析结果
+    ai_results = [None] * len(repos)
+    for index, repo in enumerate(repos):
+        if repo.get('previous_ai_result') is not None:
+            ai_results[index] = repo['previous_ai_result']
+        elif incremental_state is not None:
+            ai_results[index] = incremental_state.match_content(repo)
+        if ai_results[index] is not None:
+            complete(index, ai_results[index])
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if AI_BATCH_MODE and sum(result is None for result in ai_results) > 1:
+            analyze_repos_in_batches(repos, ai_results, executor, rate_limiter, on_result=complete)
+        
+        # 未在批量分析中得到有效结果的项目逐个分析
+        futures = {
+            index: executor.submit(analyze_and_complete, index)
+            for index in range(len(repos)) if ai_results[index] is None
+        }
+        for index, future in futures.items():
+            ai_results[index] = future.result()
+    
+    if streaming:
+        return None
+    if incremental_state is not None:
+        for repo, ai_result in zip(repos, ai_results):
+            incremental_state.update(repo, ai_result)
+    return [build_project_record(repo, ai_result) for repo, ai_result in zip(repos, ai_results)]
 
 def check_environment():
     """检查运行环境，判断是否可能在模拟环境中"""
@@ -410,7 +1236,7 @@ def check_environment():
             logger.warning("系统将尝试实际OSS上传，并在失败时提供替代方案")
         else:
             logger.warning("⚠️ 程序可能在受限环境中运行，OSS上传可能会受到限制")
-            logger.warning("文件将保存在本地oss_upload_simulator目录作为替代方案")
+            logger.warning(f"文件将保存在本地{LOCAL_STORAGE_DIR}目录作为替代方案")
     
     return is_sandbox
 
@@ -418,18 +1244,137 @@ def check_environment():
 # 导入upload_csv_to_oss模块中的OSS上传功能
 try:
     from upload_csv_to_oss import upload_to_oss as oss_module_upload
+    from upload_csv_to_oss import upload_files_to_oss as oss_module_upload_files
     logger.info("成功导入upload_csv_to_oss模块")
 except ImportError:
     logger.warning("无法导入upload_csv_to_oss模块，将使用内部上传实现")
     oss_module_upload = None
+    oss_module_upload_files = None
+
+# 压缩上传时的响应头，浏览器和HTTP客户端会按 Content-Encoding 自动解压
+GZIP_UPLOAD_HEADERS = {
+    'Content-Type': 'application/json; charset=utf-8',
+    'Content-Encoding': 'gzip'
+}
+
+def compress_output(filename):
+    """将输出的JSON转为紧凑格式并gzip压缩，返回压缩文件路径（固定mtime，内容不变时压缩结果不变）"""
+    gz_path = filename + '.gz'
+    with open(filename, 'r', encoding='utf_8_sig') as f:
+        data = json.load(f)
+    compact = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    with open(gz_path, 'wb') as f:
+        f.write(gzip.compress(compact, compresslevel=9, mtime=0))
+    return gz_path
+
+def prepare_output(filename):
+    """按OUTPUT_COMPRESSION准备要上传的文件，返回 (实际上传的本地文件, HTTP头)"""
+    if (OUTPUT_COMPRESSION or "none").lower() == "gzip":
+        return compress_output(filename), GZIP_UPLOAD_HEADERS
+    return filename, None
+
+def upload_output(filename):
+    """按OUTPUT_COMPRESSION上传输出文件，OSS中的文件名保持不变，返回 (是否成功, 传输统计)"""
+    upload_path, headers = prepare_output(filename)
+    start = time.time()
+    success, skipped = upload_to_oss(filename, upload_path=upload_path, headers=headers)
+    transfer = {
+        'raw_bytes': os.path.getsize(filename),
+        'upload_bytes': os.path.getsize(upload_path),
+        'seconds': time.time() - start,
+        'compressed': headers is not None,
+        'skipped': skipped
+    }
+    return success, transfer
+
+def upload_outputs(filenames):
+    """并发上传多个输出文件，只重试失败的文件，返回与filenames顺序一致的 [(是否成功, 传输统计)]"""
+    github_env = os.environ.get('GITHUB_ACTIONS') == 'true'
+    storage = get_storage()
+    can_batch = (oss_module_upload_files is not None
+                 and storage is not None
+                 and not (github_env and not GITHUB_ACTIONS_UPLOAD_OSS))
+    if not can_batch:
+        # 不满足批量上传条件时逐个上传（包含GitHub Actions中的替代方案）
+        return [upload_output(filename) for filename in filenames]
+    
+    oss_directory = OSS_FILE_PATH.rstrip('/') + '/' if OSS_FILE_PATH else ''
+    prepared = [prepare_output(filename) for filename in filenames]
+    files = [(upload_path, oss_directory + os.path.basename(filename), headers)
+             for filename, (upload_path, headers) in zip(filenames, prepared)]
+    try:
+        results = oss_module_upload_files(
+            files,
+            access_key_id=OSS_ACCESS_KEY_ID,
+            access_key_secret=OSS_ACCESS_KEY_SECRET,
+            endpoint=OSS_ENDPOINT,
+            bucket_name=OSS_BUCKET_NAME,
+            max_workers=OSS_UPLOAD_CONCURRENCY,
+            storage=storage
+        )
+    except Exception as e:
+        # 如upload_csv_to_oss的配置检查失败，改为逐个上传（失败时使用替代方案）
+        logger.error(f"批量上传失败，改为逐个上传: {e}")
+        return [upload_output(filename) for filename in filenames]
+    
+    outputs = []
+    for filename, (upload_path, headers), result in zip(filenames, prepared, results):
+        if not result['success'] and not github_env:
+            logger.info(f"尝试使用替代方案保存文件 {filename}")
+            provide_alternative_upload(filename)
+        transfer = {
+            'raw_bytes': os.path.getsize(filename),
+            'upload_bytes': os.path.getsize(upload_path),
+            'seconds': result['seconds'],
+            'compressed': headers is not None,
+            'skipped': result['skipped']
+        }
+        outputs.append((result['success'], transfer))
+    return outputs
+
+def update_manifest(date_str, tag_outputs):
+    """把本次上传成功的数据集写入存储中的索引 manifest.json，返回写入的条目数
+
+    tag_outputs 为 [(标签, 文件名, 是否上传成功, 传输统计)]；条目的大小和CRC64以存储中的对象为准，
+    替代方案保存的文件（未进入存储）不会写入索引。
+    """
+    github_env = os.environ.get('GITHUB_ACTIONS') == 'true'
+    storage = get_storage()
+    if not MANIFEST_ENABLED or storage is None or (github_env and not GITHUB_ACTIONS_UPLOAD_OSS):
+        return 0
+    
+    manifest = Manifest(storage, get_oss_directory() + MANIFEST_FILENAME)
+    count = 0
+    try:
+        for tag, filename, success, transfer in tag_outputs:
+            if not success:
+                continue
+            key = get_oss_directory() + os.path.basename(filename)
+            info = storage.head(key)
+            if info is None:
+                logger.warning(f"存储中未找到 {key}，不写入数据集索引")
+                continue
+            manifest.add(get_type_prefix(tag), date_str, key, info.size, info.crc64, compressed=transfer['compressed'])
+            count += 1
+        if count:
+            manifest.save()
+    except Exception as e:
+        logger.warning(f"更新数据集索引失败: {e}")
+        return 0
+    return count
+
+def upload_to_oss(filename, upload_path=None, headers=None):
+    """将文件上传到OSS，失败时提供替代方案，返回 (是否成功, 是否因内容未变化跳过上传)
 
-def upload_to_oss(filename):
-    """将文件上传到OSS，失败时提供替代方案"""
+    OSS中的文件名取自filename，实际上传的内容为upload_path（默认即filename），headers为附加的HTTP头。
+    """
+    upload_path = upload_path or filename
     try:
-        # 检查OSS配置是否完整
-        if not all([OSS_ACCESS_KEY_ID, OSS_ACCESS_KEY_SECRET, OSS_ENDPOINT, OSS_BUCKET_NAME]):
+        # 检查OSS配置是否完整（本地存储后端不需要OSS配置）
+        storage = get_storage()
+        if storage is None:
             logger.warning("OSS配置不完整，跳过上传")
-            return False
+            return False, False
         
         # 检查运行环境
         is_sandbox = check_environment()
@@ -440,7 +1385,7 @@ def upload_to_oss(filename):
         # 在GitHub Actions环境中，根据配置决定是否尝试实际上传
         if github_env and not GITHUB_ACTIONS_UPLOAD_OSS:
             logger.info("GITHUB_ACTIONS_UPLOAD_OSS设置为False，在GitHub Actions环境中使用替代上传方案")
-            return provide_alternative_upload(filename)
+            return provide_alternative_upload(filename), False
         
         # 优先使用upload_csv_to_oss模块的上传功能
         if oss_module_upload:
@@ -449,60 +1394,45 @@ def upload_to_oss(filename):
             oss_directory = OSS_FILE_PATH.rstrip('/') + '/' if OSS_FILE_PATH else ''
             full_oss_file_path = oss_directory + os.path.basename(filename)
             
-            success = oss_module_upload(
-                filename=filename,
+            result = oss_module_upload(
+                filename=upload_path,
                 access_key_id=OSS_ACCESS_KEY_ID,
                 access_key_secret=OSS_ACCESS_KEY_SECRET,
                 endpoint=OSS_ENDPOINT,
                 bucket_name=OSS_BUCKET_NAME,
-                oss_file_path=full_oss_file_path
+                oss_file_path=full_oss_file_path,
+                headers=headers,
+                storage=storage,
+                return_result=True
             )
             
             # 如果上传失败并且不在GitHub Actions环境中，尝试替代上传方案
-            if not success and not github_env:
+            if not result['success'] and not github_env:
                 logger.info("尝试使用替代方案保存文件")
-                return provide_alternative_upload(filename)
+                return provide_alternative_upload(filename), False
             
-            return success
+            return result['success'], result['skipped']
         
         # 如果无法导入upload_csv_to_oss模块，则使用备用上传实现
         logger.info("使用备用上传实现")
-        # 设置重试次数和间隔
-        max_retries = 3
-        retry_interval = 3
+        # 每次上传使用新的重试策略，重试预算只覆盖本次上传（FC热启动时进程内会多次运行main）
+        policy = RetryPolicy(max_attempts=OSS_RETRY_MAX_ATTEMPTS, base_delay=OSS_RETRY_BASE_DELAY,
+                             budget=OSS_RETRY_BUDGET)
+        env_label = "[GitHub Actions] " if github_env else ""
         
-        for attempt in range(max_retries):
+        attempt = 0
+        while True:
+            attempt += 1
             try:
-                env_label = "[GitHub Actions] " if github_env else ""
-                logger.info(f"{env_label}正在上传文件 {filename} 到OSS (尝试 {attempt+1}/{max_retries})...")
-                
-                # 创建OSS认证对象
-                auth = oss2.Auth(OSS_ACCESS_KEY_ID, OSS_ACCESS_KEY_SECRET)
-                
-                # 创建OSS Bucket对象
-                bucket = oss2.Bucket(auth, OSS_ENDPOINT, OSS_BUCKET_NAME)
+                logger.info(f"{env_label}正在上传文件 {filename} 到OSS (尝试 {attempt}/{policy.max_attempts})...")
                 
                 # 构建OSS文件路径
-                oss_file_path = OSS_FILE_PATH.rstrip('/') + '/' + filename
+                oss_file_path = get_oss_directory() + os.path.basename(filename)
                 
-                # 上传文件
-                result = bucket.put_object_from_file(oss_file_path, filename, progress_callback=None)
-                
-                # 验证上传结果
-                if result.status == 200:
-                    logger.info(f"✅ {env_label}文件 {filename} 已成功上传到OSS，路径: {oss_file_path}")
-                    return True
-                else:
-                    logger.error(f"{env_label}上传返回非成功状态码: {result.status}")
-                    if attempt < max_retries - 1:
-                        logger.info(f"{retry_interval}秒后重试...")
-                        time.sleep(retry_interval)
-                    else:
-                        logger.error("已达到最大重试次数")
-                        # 只有在完全失败时才使用替代方案
-                        logger.info("尝试使用替代方案保存文件")
-                        provide_alternative_upload(filename)
-                        return False
+                # 上传文件（失败时抛出异常）
+                storage.put_file(oss_file_path, upload_path, headers=headers)
+                logger.info(f"✅ {env_label}文件 {filename} 已成功上传到{'本地存储' if storage.name == 'local' else 'OSS'}，路径: {oss_file_path}")
+                return True, False
             except oss2.exceptions.ServerError as e:
                 error_msg = f"{env_label}OSS服务器错误 - 状态码: {e.status}, 请求ID: {getattr(e, 'request_id', 'N/A')}, 错误信息: {getattr(e, 'details', 'N/A')}"
                 logger.error(error_msg)
@@ -512,32 +1442,35 @@ def upload_to_oss(filename):
                     logger.error("⚠️ 权限错误，请检查OSS密钥和Bucket权限配置")
                 elif e.status == 404:
                     logger.error("⚠️ Bucket不存在，请检查OSS_ENDPOINT和OSS_BUCKET_NAME配置")
-                elif e.status == 502 or e.status == 503 or e.status == 504:
+                elif e.status == 429 or e.status == 503:
+                    logger.error("⚠️ OSS限流或服务繁忙，将退避后重试")
+                elif e.status == 502 or e.status == 504:
                     logger.error("⚠️ 网络超时或服务不可用，可能是GitHub Actions环境的网络限制")
-                    
-                if attempt < max_retries - 1:
-                    logger.info(f"{retry_interval}秒后重试...")
-                    time.sleep(retry_interval)
-                else:
-                    logger.info("尝试使用替代方案保存文件")
-                    provide_alternative_upload(filename)
-                    return False
+                retryable = is_retryable_error(e)
             except Exception as e:
                 logger.error(f"{env_label}上传文件到OSS失败: {e}")
                 import traceback
                 traceback.print_exc()
-                
-                if attempt < max_retries - 1:
-                    logger.info(f"{retry_interval}秒后重试...")
-                    time.sleep(retry_interval)
-                else:
-                    logger.info("尝试使用替代方案保存文件")
-                    provide_alternative_upload(filename)
-                    return False
+                retryable = is_retryable_error(e)
+            
+            if not retryable:
+                logger.error("该错误重试也不会成功，放弃上传")
+                break
+            delay = policy.next_delay(attempt)
+            if delay is None:
+                logger.error("已达到最大重试次数或重试预算已用完")
+                break
+            logger.info(f"{delay:.1f}秒后重试...")
+            time.sleep(delay)
+        
+        # 只有在完全失败时才使用替代方案
+        logger.info("尝试使用替代方案保存文件")
+        provide_alternative_upload(filename)
+        return False, False
     except Exception as e:
         logger.error(f"处理OSS上传时发生未预期错误: {e}")
         provide_alternative_upload(filename)
-        return False
+        return False, False
 
 def provide_alternative_upload(filename):
     """提供替代的上传方案"""
@@ -549,18 +1482,11 @@ def provide_alternative_upload(filename):
             # 在 GitHub Actions 环境中，我们认为上传成功（因为文件已保存）
             return True
         
-        # 创建一个本地目录来模拟上传
-        local_upload_dir = "oss_upload_simulator"
-        if not os.path.exists(local_upload_dir):
-            os.makedirs(local_upload_dir)
-            logger.info(f"创建模拟上传目录: {local_upload_dir}")
+        # 保存到本地存储目录（与 STORAGE_BACKEND="local" 使用同一套存储实现）
+        key = os.path.basename(filename)
+        LocalStorage(LOCAL_STORAGE_DIR).put_file(key, filename)
         
-        # 复制文件到模拟上传目录
-        import shutil
-        destination = os.path.join(local_upload_dir, filename)
-        shutil.copy2(filename, destination)
-        
-        logger.info(f"✅ 文件已复制到模拟上传目录: {destination}")
+        logger.info(f"✅ 文件已保存到本地存储目录: {os.path.join(LOCAL_STORAGE_DIR, key)}")
         logger.info("\n===== 手动上传建议 =====")
         logger.info("如果需要将文件实际上传到OSS，您可以:")
         logger.info(f"1. 登录阿里云OSS控制台")
@@ -577,64 +1503,122 @@ def provide_alternative_upload(filename):
 
 def main():
     """主函数"""
+    reset_run_state()
     try:
-        repos = get_github_trending()
-        data_list = []
-        
-        if not repos:
-            logger.warning("未获取到GitHub项目数据")
-            # 创建一些模拟数据用于测试
-            data_list.append({
-                "项目标签": "开发者工具（Developer Tools）",
-                "项目名称": "测试项目",
-                "项目地址": "https://github.com",
-                "项目README": "这是一个测试项目的README概括"
-            })
-        else:
-            for repo in repos:
-                ai_result = analyze_with_ai(repo)
-                
-                # 解析AI结果
-                lines = ai_result.split('\n')
-                tags_line = next((line for line in lines if '标签' in line), "标签: 开发者工具（Developer Tools）")
-                # 提取标签并去掉可能的方括号
-                tags = tags_line.split(':')[1].strip()
-                if tags.startswith('[') and tags.endswith(']'):
-                    tags = tags[1:-1].strip()
-                
-                readme_summary_line = next((line for line in lines if 'README概括' in line), "README概括: 无法概括README内容")
-                readme_summary = readme_summary_line.split(':')[1].strip()
-                
-                data_list.append({
-                    "项目标签": tags,
-                    "项目名称": repo['name'],
-                    "项目地址": repo['html_url'],
-                    "项目README": readme_summary
-                })
-                
-                # 避免 API 速率限制
-                time.sleep(1)
-
-        # 保存到 JSON
+        tags = get_project_tags()
+        tag_repos = get_github_trending(tags)
+        
         # 按照"类型_年月日"的格式命名JSON文件
-        type_prefix = PROJECT_TAG.lower() if PROJECT_TAG and PROJECT_TAG.lower() != "all" else "all"
-        filename = f"{type_prefix}_projects_{datetime.now().strftime('%Y%m%d')}.json"
+        date_str = datetime.now().strftime('%Y%m%d')
+        filenames = {tag: f"{get_type_prefix(tag)}_projects_{date_str}.json" for tag in tags}
+        
+        # 多个标签下出现的同一项目只分析一次，各标签共享分析结果
+        repos = list({repo['full_name']: repo for tag in tags for repo in tag_repos.get(tag, [])}.values())
+        records = {}
+        writers = {}
+        if repos:
+            on_record = None
+            if STREAM_OUTPUT:
+                # 流式输出：每个项目完成后按该标签下的Star顺序写入 .jsonl，下游可以读取部分结果
+                positions = {tag: {repo['full_name']: i for i, repo in enumerate(tag_repos[tag])}
+                             for tag in tags if tag_repos.get(tag)}
+                writers = {tag: OrderedJSONLWriter(filenames[tag][:-len('.json')] + '.jsonl') for tag in positions}
+                
+                def on_record(index, record):
+                    full_name = repos[index]['full_name']
+                    for tag, writer in writers.items():
+                        if full_name in positions[tag]:
+                            writer.write(positions[tag][full_name], record)
+            
+            # 在进入并发分析前加载缓存，避免多个线程同时加载
+            ai_cache = get_ai_result_cache()
+            data = analyze_repos(repos, on_record=on_record)
+            if data is not None:
+                records = {repo['full_name']: record for repo, record in zip(repos, data)}
+            for writer in writers.values():
+                writer.close()
+            if ai_cache is not None:
+                ai_cache.save()
+            if _incremental_state is not None:
+                _incremental_state.save()
         
-        # 保存为JSON文件
-        with open(filename, 'w', encoding='utf_8_sig') as json_file:
-            json.dump(data_list, json_file, ensure_ascii=False, indent=2)
+        outputs = []
+        for tag in tags:
+            filename = filenames[tag]
+            if tag in writers:
+                # 由 .jsonl 逐行生成最终的 .json 文件
+                count = jsonl_to_json(writers[tag].path, filename)
+                logger.info(f"✅ 完成！数据已保存为 {filename}（流式结果: {writers[tag].path}）")
+                outputs.append((filename, count))
+                continue
+            
+            if tag_repos.get(tag):
+                data_list = [records[repo['full_name']] for repo in tag_repos[tag]]
+            else:
+                logger.warning(f"未获取到标签 {tag} 的GitHub项目数据")
+                # 创建一些模拟数据用于测试
+                data_list = [{
+                    "项目标签": "开发者工具（Developer Tools）",
+                    "项目名称": "测试项目",
+                    "项目地址": "https://github.com",
+                    "项目README": "这是一个测试项目的README概括"
+                }]
+            
+            # 保存为JSON文件
+            with open(filename, 'w', encoding='utf_8_sig') as json_file:
+                json.dump(data_list, json_file, ensure_ascii=False, indent=2)
+            
+            logger.info(f"✅ 完成！数据已保存为 {filename}")
+            
+            outputs.append((filename, len(data_list)))
         
-        logger.info(f"✅ 完成！数据已保存为 {filename}")
+        # 所有标签的文件一起并发上传到OSS
+        upload_results = upload_outputs([filename for filename, _ in outputs])
+        outputs = [output + result for output, result in zip(outputs, upload_results)]
+        manifest_count = update_manifest(date_str, [(tag, filename, success, transfer) for tag, (filename, _, success, transfer)
+                                                    in zip(tags, outputs)])
         
-        # 上传到OSS
-        oss_upload_success = upload_to_oss(filename)
+        # 所有文件都已输出，本次运行不再需要断点日志
+        if _checkpoint_journal is not None:
+            _checkpoint_journal.clear()
         
         # 输出最终状态报告
         logger.info("\n===== 程序运行总结 =====")
-        logger.info(f"- 处理项目数量: {len(data_list)}")
-        logger.info(f"- 数据已保存到JSON: {filename}")
-        logger.info(f"- OSS配置状态: {'已配置' if all([OSS_ACCESS_KEY_ID, OSS_ACCESS_KEY_SECRET, OSS_ENDPOINT, OSS_BUCKET_NAME]) else '未完全配置'}")
-        logger.info(f"- OSS上传状态: {'成功' if oss_upload_success else '失败'}")
+        logger.info(f"- 处理项目数量: {len(repos)}（标签: {', '.join(tags)}）")
+        github_client = get_github_client(GH_TOKEN)
+        github_stats = github_client.stats
+        logger.info(f"- GitHub请求数: {github_stats['requests']}，触发限流: {github_stats['rate_limited']} 次，限流等待: {github_stats['waited_seconds']:.1f} 秒")
+        if _ai_result_cache is not None:
+            ai_cache = _ai_result_cache
+            logger.info(f"- AI结果缓存: 命中 {ai_cache.stats['hits']} 次，未命中 {ai_cache.stats['misses']} 次")
+        if _incremental_state is not None:
+            state_stats = _incremental_state.stats
+            logger.info(f"- 增量运行: 跳过详情获取 {state_stats['skipped_enrich']} 个，复用AI结果 {state_stats['skipped_enrich'] + state_stats['reused_ai']} 个")
+        if _readme_preprocessor is not None:
+            readme_stats = _readme_preprocessor.stats
+            logger.info(f"- README预处理: {readme_stats['readmes']} 个，原始 {readme_stats['raw_tokens']} tokens，"
+                        f"预处理后 {readme_stats['processed_tokens']} tokens，节省 {_readme_preprocessor.tokens_saved} tokens")
+        if github_client.cache is not None:
+            cache_stats = github_client.cache.stats
+            logger.info(f"- HTTP缓存: 命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次，淘汰 {cache_stats['evicted']} 条，节省下载 {cache_stats['bytes_saved'] / 1024:.1f} KB")
+        if (STORAGE_BACKEND or "oss").lower() == "local":
+            logger.info(f"- 存储后端: 本地目录 {LOCAL_STORAGE_DIR}")
+        else:
+            logger.info(f"- OSS配置状态: {'已配置' if all([OSS_ACCESS_KEY_ID, OSS_ACCESS_KEY_SECRET, OSS_ENDPOINT, OSS_BUCKET_NAME]) else '未完全配置'}")
+        skipped_count = sum(1 for _, _, success, transfer in outputs if success and transfer['skipped'])
+        uploaded_count = sum(1 for _, _, success, transfer in outputs if success and not transfer['skipped'])
+        if manifest_count:
+            logger.info(f"- 数据集索引: 已写入 {manifest_count} 个条目到 {get_oss_directory() + MANIFEST_FILENAME}")
+        logger.info(f"- OSS上传: 上传 {uploaded_count} 个文件，内容未变化跳过 {skipped_count} 个，失败 {len(outputs) - uploaded_count - skipped_count} 个")
+        for filename, count, oss_upload_success, transfer in outputs:
+            upload_status = ('内容未变化，跳过上传' if transfer['skipped'] else '成功') if oss_upload_success else '失败'
+            logger.info(f"- 数据已保存到JSON: {filename}（{count} 个项目），OSS上传状态: {upload_status}")
+            if transfer['compressed'] and oss_upload_success and not transfer['skipped']:
+                ratio = transfer['upload_bytes'] / transfer['raw_bytes'] if transfer['raw_bytes'] else 1
+                # 原样上传的耗时按本次的传输速率估算
+                raw_seconds = transfer['seconds'] / ratio if ratio else transfer['seconds']
+                logger.info(f"  gzip压缩上传: {transfer['raw_bytes'] / 1024:.1f} KB -> {transfer['upload_bytes'] / 1024:.1f} KB（{ratio:.0%}），"
+                            f"上传耗时 {transfer['seconds']:.2f} 秒，原样上传约需 {raw_seconds:.2f} 秒")
         logger.info("====================")
     except Exception as e:
         logger.error(f"程序运行异常: {e}")
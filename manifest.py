@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import json
+import time
+import logging
+import threading
+
+from storage import ObjectNotFound
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def normalize_date(date):
+    """YYYY-MM-DD 或 YYYYMMDD 统一为 YYYYMMDD"""
+    return date.replace('-', '')
+
+
+class Manifest:
+    """存储中的数据集索引：(类型前缀, 日期) -> 对象键、大小、CRC64
+
+    读取方只需一次GET即可定位任意日期的数据，也可以直接查询最新日期或日期范围，不需要列举或猜测文件名。
+    格式: {"version": 1, "datasets": {类型前缀: {"YYYYMMDD": {"key", "size", "crc64", "compressed", "updated_at"}}}}
+    """
+    def __init__(self, storage, key=MANIFEST_FILENAME):
+        self.storage = storage
+        self.key = key
+        self.datasets = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        """读取索引，不存在时返回False并从空索引开始"""
+        try:
+            content = json.loads(self.storage.get(self.key).decode('utf-8'))
+        except ObjectNotFound:
+            logger.info(f"存储中暂无数据集索引 {self.key}")
+            return False
+        with self.lock:
+            self.datasets = content.get('datasets', {})
+        return True
+
+    def add(self, tag, date, key, size, crc64, compressed=False):
+        with self.lock:
+            self.datasets.setdefault(tag, {})[normalize_date(date)] = {
+                'key': key,
+                'size': size,
+                'crc64': str(crc64) if crc64 is not None else None,
+                'compressed': compressed,
+                'updated_at': int(time.time())
+            }
+
+    def save(self):
+        """写入前重新读取一次并合并，减少并行运行（如多个标签分别运行）互相覆盖条目"""
+        with self.lock:
+            pending = {tag: dict(entries) for tag, entries in self.datasets.items()}
+        self.load()
+        with self.lock:
+            for tag, entries in pending.items():
+                self.datasets.setdefault(tag, {}).update(entries)
+            content = json.dumps({'version': MANIFEST_VERSION, 'datasets': self.datasets},
+                                 ensure_ascii=False, sort_keys=True)
+        self.storage.put(self.key, content.encode('utf-8'))
+        logger.info(f"已更新数据集索引 {self.key}")
+
+    def lookup(self, tag, date):
+        """返回指定类型前缀和日期的条目，不存在时返回None"""
+        with self.lock:
+            return self.datasets.get(tag, {}).get(normalize_date(date))
+
+    def latest(self, tag):
+        """返回 (日期YYYYMMDD, 条目)，没有任何数据时返回 (None, None)"""
+        with self.lock:
+            entries = self.datasets.get(tag, {})
+            if not entries:
+                return None, None
+            date = max(entries)
+            return date, entries[date]
+
+    def between(self, tag, start, end):
+        """按日期升序返回 [start, end] 范围内的 [(日期YYYYMMDD, 条目)]"""
+        start, end = normalize_date(start), normalize_date(end)
+        with self.lock:
+            return sorted((date, entry) for date, entry in self.datasets.get(tag, {}).items() if start <= date <= end)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+
+import oss2
+
+logger = logging.getLogger(__name__)
+
+# 同一进程内（包括FC的热启动调用）的多次上传/下载复用已建立的TCP/TLS连接
+# 连接池大小的下限（与oss2默认值相同），实际大小按上传并发数计算，见 pool_size_for
+DEFAULT_POOL_SIZE = 10
+# 除并发上传的分片外，为 head/get/manifest 等请求预留的连接数
+EXTRA_CONNECTIONS = 4
+# oss2 将该值同时用作连接超时和读取超时
+DEFAULT_TIMEOUT = 60
+
+_buckets = {}
+_pool_sizes = {}
+_buckets_lock = threading.Lock()
+
+
+def pool_size_for(upload_concurrency, multipart_threads):
+    """按上传并发计算连接池大小：每个并发上传的文件最多同时上传 multipart_threads 个分片，连接数不足时urllib3会丢弃多余的连接"""
+    return max(DEFAULT_POOL_SIZE, upload_concurrency * multipart_threads + EXTRA_CONNECTIONS)
+
+
+def get_shared_bucket(access_key_id, access_key_secret, endpoint, bucket_name,
+                      pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+    """获取进程内共享的OSS Bucket（按密钥、Endpoint和Bucket名称缓存），所有请求复用同一个连接池
+
+    已缓存的Bucket连接池小于 pool_size 时按新的大小重新创建。
+    """
+    key = (access_key_id, access_key_secret, endpoint, bucket_name)
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None or _pool_sizes[key] < pool_size:
+            auth = oss2.Auth(access_key_id, access_key_secret)
+            bucket = oss2.Bucket(auth, endpoint, bucket_name,
+                                 session=oss2.Session(pool_size=pool_size),
+                                 connect_timeout=timeout)
+            _buckets[key] = bucket
+            _pool_sizes[key] = pool_size
+            logger.info(f"创建共享OSS Bucket连接: {bucket_name}，连接池大小: {pool_size}，超时: {timeout} 秒")
+        return bucket
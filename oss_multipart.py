@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import oss2
+from oss2.models import PartInfo
+
+from oss_retry import is_retryable_error
+
+logger = logging.getLogger(__name__)
+
+# OSS要求除最后一个分片外每个分片不小于100KB
+MIN_PART_SIZE = 100 * 1024
+
+
+class MultipartUploader:
+    """可断点续传的OSS分片上传：分片并发上传，每完成一个分片就写入本地断点文件
+
+    上传中断后再次上传同一个文件时，只上传断点文件中尚未完成的分片。
+    断点文件按 (Bucket, OSS路径, 本地文件绝对路径) 命名，本地文件大小或修改时间变化时重新上传全部分片。
+    """
+    def __init__(self, bucket, checkpoint_dir, part_size, num_threads=4):
+        self.bucket = bucket
+        self.checkpoint_dir = checkpoint_dir
+        self.part_size = max(MIN_PART_SIZE, part_size)
+        self.num_threads = max(1, num_threads)
+        self.lock = threading.Lock()
+
+    def _checkpoint_path(self, oss_file_path, file_path):
+        name = f"{self.bucket.bucket_name}|{oss_file_path}|{os.path.abspath(file_path)}"
+        return os.path.join(self.checkpoint_dir, hashlib.sha1(name.encode('utf-8')).hexdigest() + '.json')
+
+    def _load_checkpoint(self, path, oss_file_path, file_path):
+        """读取与本地文件匹配的断点，不存在或已失效时返回None（失效的断点会取消对应的分片上传任务）"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        stat = os.stat(file_path)
+        if (checkpoint.get('size') != stat.st_size or checkpoint.get('mtime') != int(stat.st_mtime)
+                or checkpoint.get('part_size') != self.part_size):
+            logger.info("本地文件已变化，放弃上次的分片上传进度")
+            self._abort(oss_file_path, checkpoint.get('upload_id'))
+            self._remove_checkpoint(path)
+            return None
+        return checkpoint
+
+    def _abort(self, oss_file_path, upload_id):
+        """取消分片上传任务，释放OSS中已上传的分片（未取消的分片会一直占用存储并计费）"""
+        if not upload_id:
+            return
+        try:
+            self.bucket.abort_multipart_upload(oss_file_path, upload_id)
+            logger.info(f"已取消分片上传任务: {oss_file_path} ({upload_id})")
+        except oss2.exceptions.NoSuchUpload:
+            pass
+        except Exception as e:
+            logger.warning(f"取消分片上传任务失败: {oss_file_path} ({upload_id}): {e}")
+
+    def abort(self, oss_file_path, file_path):
+        """放弃文件的分片上传（如重试已用完）：取消断点中记录的上传任务并删除断点，没有断点时不做任何操作"""
+        path = self._checkpoint_path(oss_file_path, file_path)
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                upload_id = json.load(f).get('upload_id')
+        except (OSError, ValueError):
+            upload_id = None
+        self._abort(oss_file_path, upload_id)
+        self._remove_checkpoint(path)
+
+    def _save_checkpoint(self, path, checkpoint):
+        """保存断点（调用方需持有锁）"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+
+    def _remove_checkpoint(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def upload(self, oss_file_path, file_path, headers=None):
+        """分片上传文件，返回 complete_multipart_upload 的结果"""
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        checkpoint_path = self._checkpoint_path(oss_file_path, file_path)
+        stat = os.stat(file_path)
+        part_count = max(1, (stat.st_size + self.part_size - 1) // self.part_size)
+
+        checkpoint = self._load_checkpoint(checkpoint_path, oss_file_path, file_path)
+        if checkpoint is not None:
+            logger.info(f"继续上次的分片上传: {oss_file_path}，已完成 {len(checkpoint['parts'])}/{part_count} 个分片")
+        else:
+            upload_id = self.bucket.init_multipart_upload(oss_file_path, headers=headers).upload_id
+            checkpoint = {
+                'upload_id': upload_id,
+                'size': stat.st_size,
+                'mtime': int(stat.st_mtime),
+                'part_size': self.part_size,
+                'parts': {}
+            }
+            with self.lock:
+                self._save_checkpoint(checkpoint_path, checkpoint)
+            logger.info(f"开始分片上传: {oss_file_path}，共 {part_count} 个分片，分片大小 {self.part_size / 1024 / 1024:.1f} MB")
+
+        upload_id = checkpoint['upload_id']
+        pending = [n for n in range(1, part_count + 1) if str(n) not in checkpoint['parts']]
+
+        def upload_part(part_number):
+            offset = (part_number - 1) * self.part_size
+            with open(file_path, 'rb') as f:
+                f.seek(offset)
+                data = f.read(self.part_size)
+            start = time.time()
+            result = self.bucket.upload_part(oss_file_path, upload_id, part_number, data)
+            elapsed = time.time() - start
+            speed = len(data) / 1024 / 1024 / elapsed if elapsed > 0 else 0
+            logger.info(f"分片 {part_number}/{part_count} 上传完成: {len(data) / 1024 / 1024:.2f} MB，"
+                        f"耗时 {elapsed:.2f} 秒，{speed:.2f} MB/s")
+            with self.lock:
+                checkpoint['parts'][str(part_number)] = result.etag
+                self._save_checkpoint(checkpoint_path, checkpoint)
+
+        try:
+            start = time.time()
+            with ThreadPoolExecutor(max_workers=min(self.num_threads, len(pending) or 1)) as executor:
+                list(executor.map(upload_part, pending))
+            parts = [PartInfo(int(n), etag) for n, etag in sorted(checkpoint['parts'].items(), key=lambda item: int(item[0]))]
+            result = self.bucket.complete_multipart_upload(oss_file_path, upload_id, parts)
+        except oss2.exceptions.NoSuchUpload:
+            # 上传任务已过期或被清理，下次从头上传
+            self._remove_checkpoint(checkpoint_path)
+            raise
+        except Exception as e:
+            if not is_retryable_error(e):
+                # 重试也不会成功（如权限或配置错误），取消任务并删除断点，不留下计费的分片
+                self._abort(oss_file_path, upload_id)
+                self._remove_checkpoint(checkpoint_path)
+            raise
+
+        elapsed = time.time() - start
+        uploaded_bytes = sum(min(self.part_size, stat.st_size - (n - 1) * self.part_size) for n in pending)
+        logger.info(f"分片上传完成: {oss_file_path}，本次上传 {len(pending)} 个分片 {uploaded_bytes / 1024 / 1024:.2f} MB，"
+                    f"耗时 {elapsed:.2f} 秒，平均 {uploaded_bytes / 1024 / 1024 / elapsed if elapsed > 0 else 0:.2f} MB/s")
+        self._remove_checkpoint(checkpoint_path)
+        return result
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import random
+import logging
+import threading
+
+import oss2
+
+logger = logging.getLogger(__name__)
+
+# 重试策略的默认值：最多尝试次数、首次重试的基础等待时间、单次等待上限、一轮上传所有重试等待的总预算（秒）
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_BUDGET = 60.0
+
+# 限流/超时类的4xx状态码，稍后重试可能成功
+RETRYABLE_STATUS = (408, 429)
+# 配置或权限错误码，重试也不会成功
+FATAL_ERROR_CODES = ('AccessDenied', 'NoSuchBucket', 'InvalidAccessKeyId', 'SignatureDoesNotMatch',
+                     'InvalidBucketName', 'UserDisable')
+
+
+def is_retryable_status(status):
+    """HTTP状态码是否值得重试：限流（429）、超时（408）和服务端错误（5xx）"""
+    return status in RETRYABLE_STATUS or status >= 500
+
+
+def is_retryable_error(error):
+    """异常是否值得重试
+
+    网络错误、限流和5xx重试；鉴权、Bucket配置等错误以及本地文件错误立即失败。
+    """
+    if isinstance(error, oss2.exceptions.RequestError):
+        return True
+    if isinstance(error, oss2.exceptions.OssError):
+        if getattr(error, 'code', '') in FATAL_ERROR_CODES:
+            return False
+        return is_retryable_status(error.status)
+    if isinstance(error, OSError):
+        return False
+    return True
+
+
+class RetryPolicy:
+    """指数退避 + 随机抖动（full jitter）的重试策略，带重试预算（线程安全）
+
+    第n次重试前等待 [0, min(max_delay, base_delay * 2^(n-1))] 内的随机时间，
+    同一个策略对象的所有重试共享总等待预算，预算用完后不再重试，避免服务端持续503时反复加压。
+    """
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, budget=DEFAULT_BUDGET):
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.budget = float(budget)
+        self.lock = threading.Lock()
+        self.stats = {'retries': 0, 'waited_seconds': 0.0, 'budget_exhausted': 0}
+
+    def next_delay(self, attempt):
+        """第attempt次尝试（从1开始）失败后的等待秒数，已达最大次数或预算用完时返回None"""
+        if attempt >= self.max_attempts:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        with self.lock:
+            if self.stats['waited_seconds'] + delay > self.budget:
+                self.stats['budget_exhausted'] += 1
+                logger.warning(f"OSS重试预算（{self.budget:.0f} 秒）已用完，不再重试")
+                return None
+            self.stats['retries'] += 1
+            self.stats['waited_seconds'] += delay
+        return delay
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import time
+import threading
+
+
+class TokenBucket:
+    """线程安全的令牌桶限流器
+
+    rate 为每秒补充的令牌数，capacity 为桶容量（允许的最大突发请求数）。
+    """
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, tokens=1):
+        """获取令牌，令牌不足时阻塞等待，返回实际等待的秒数"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                wait_time = (tokens - self.tokens) / self.rate if self.rate > 0 else 1.0
+            time.sleep(wait_time)
+            waited += wait_time
+
+    def limit_tokens(self, tokens):
+        """将桶内令牌数压低到服务端告知的剩余额度"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, float(tokens))
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+import re
+import logging
+import threading
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# tiktoken 不认识的模型（如第三方兼容接口）统一使用该编码估算
+DEFAULT_ENCODING = "cl100k_base"
+
+HTML_COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+CODE_FENCE_RE = re.compile(r'^[ \t]*(```|~~~).*?^[ \t]*\1[^\n]*$', re.S | re.M)
+# 徽章通常是带链接的图片：[![alt](图片)](链接)
+BADGE_RE = re.compile(r'\[!\[[^\]]*\]\([^)]*\)\]\([^)]*\)')
+IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)|!\[[^\]]*\]\[[^\]]*\]')
+LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)|\[([^\]]*)\]\[[^\]]*\]')
+LINK_DEFINITION_RE = re.compile(r'^[ \t]*\[[^\]]+\]:\s*\S+.*$', re.M)
+HTML_BLOCK_RE = re.compile(r'<(script|style|svg|picture)\b.*?</\1>', re.S | re.I)
+HTML_TAG_RE = re.compile(r'</?[a-zA-Z][^>]*>')
+URL_RE = re.compile(r'https?://\S+')
+HORIZONTAL_RULE_RE = re.compile(r'^[ \t]*([-*_=])([ \t]*\1){2,}[ \t]*$', re.M)
+HEADING_RE = re.compile(r'^#{1,6}\s+\S')
+SETEXT_HEADING_RE = re.compile(r'^(.+)\n[=-]{3,}[ \t]*$', re.M)
+
+TRUNCATED_MARKER = "\n... (内容过长，已截断)"
+# 剩余预算少于该token数时不再截断保留段落（截断后的片段过短，没有意义）
+MIN_TRUNCATED_TOKENS = 16
+
+
+class TokenCounter:
+    """按模型计算token数：安装了 tiktoken 时使用真实分词器，否则按字符数估算"""
+    def __init__(self, model=None):
+        self.encoding = None
+        if tiktoken is None:
+            return
+        try:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(DEFAULT_ENCODING)
+            except KeyError:
+                # 未知模型使用默认编码
+                self.encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+        except Exception as e:
+            # 编码文件需要联网下载，失败时退回估算
+            self.encoding = None
+            logger.warning(f"加载tiktoken编码失败，将按字符数估算token: {e}")
+
+    def count(self, text):
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return estimate_tokens(text)
+
+    def truncate(self, text, max_tokens):
+        """将文本截断到不超过 max_tokens 个token"""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return self.encoding.decode(tokens[:max_tokens]) if len(tokens) > max_tokens else text
+        low, high = 0, len(text)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if estimate_tokens(text[:mid]) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        return text[:low]
+
+
+def estimate_tokens(text):
+    """粗略估算文本的token数：中文字符约1个token，其余字符约4个字符1个token"""
+    cjk_count = sum(1 for ch in text if '\u4e00' <= ch <= '\u9fff')
+    return cjk_count + (len(text) - cjk_count) // 4 + 1
+
+
+def clean_readme(text):
+    """去掉README中不含语义的内容：代码块、徽章、图片、HTML标签、链接地址和分隔线"""
+    text = text.replace('\r\n', '\n')
+    text = HTML_COMMENT_RE.sub('', text)
+    text = CODE_FENCE_RE.sub('', text)
+    text = HTML_BLOCK_RE.sub('', text)
+    text = BADGE_RE.sub('', text)
+    text = IMAGE_RE.sub('', text)
+    text = LINK_DEFINITION_RE.sub('', text)
+    text = LINK_RE.sub(lambda m: m.group(1) if m.group(1) is not None else m.group(2), text)
+    text = HTML_TAG_RE.sub('', text)
+    text = URL_RE.sub('', text)
+    text = HORIZONTAL_RULE_RE.sub('', text)
+    text = SETEXT_HEADING_RE.sub(lambda m: f"# {m.group(1).strip()}", text)
+
+    lines = []
+    for line in text.split('\n'):
+        # 压缩链接地址去掉后留下的多余空格，保留行首缩进
+        stripped = line.lstrip()
+        line = line[:len(line) - len(stripped)] + re.sub(r'[ \t]{2,}', ' ', stripped.rstrip())
+        # 去掉清理后只剩标点、空白或表格分隔符的行
+        if line and not re.search(r'\w', line):
+            continue
+        lines.append(line)
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+
+def split_blocks(text):
+    """按空行将文本切分为段落块"""
+    return [block.strip() for block in re.split(r'\n\s*\n', text) if block.strip()]
+
+
+def is_heading(block):
+    return bool(HEADING_RE.match(block)) and '\n' not in block
+
+
+def heading_level(block):
+    return len(block) - len(block.lstrip('#'))
+
+
+def section_has_content(blocks, indexes):
+    """indexes[0] 为标题，判断在下一个同级或更高级标题之前是否还有正文"""
+    level = heading_level(blocks[indexes[0]])
+    for i in indexes[1:]:
+        if not is_heading(blocks[i]):
+            return True
+        if heading_level(blocks[i]) <= level:
+            return False
+    return False
+
+
+class ReadmePreprocessor:
+    """README预处理：清理无语义内容后，按token预算保留标题和各章节开头的段落（线程安全地累计节省的token数）"""
+    def __init__(self, token_budget, model=None):
+        self.token_budget = token_budget
+        self.counter = TokenCounter(model)
+        self.lock = threading.Lock()
+        self.stats = {'readmes': 0, 'raw_tokens': 0, 'processed_tokens': 0}
+
+    def process(self, readme):
+        """返回不超过token预算的README文本"""
+        raw_tokens = self.counter.count(readme)
+        processed = self._fit_budget(split_blocks(clean_readme(readme)))
+        processed_tokens = self.counter.count(processed)
+        with self.lock:
+            self.stats['readmes'] += 1
+            self.stats['raw_tokens'] += raw_tokens
+            self.stats['processed_tokens'] += processed_tokens
+        return processed
+
+    def _fit_budget(self, blocks):
+        """优先保留标题和每个章节的第一段，预算有剩余时再按顺序补充其余段落"""
+        if not blocks:
+            return ""
+        primary = set()
+        section_has_prose = False
+        for i, block in enumerate(blocks):
+            if is_heading(block):
+                primary.add(i)
+                section_has_prose = False
+            elif not section_has_prose:
+                primary.add(i)
+                section_has_prose = True
+
+        selected = set()
+        texts = list(blocks)
+        remaining = self.token_budget
+        marker_tokens = self.counter.count(TRUNCATED_MARKER)
+        for candidates in (sorted(primary), [i for i in range(len(blocks)) if i not in primary]):
+            for i in candidates:
+                tokens = self.counter.count(blocks[i]) + 1
+                if tokens <= remaining:
+                    selected.add(i)
+                    remaining -= tokens
+                elif i in primary and not is_heading(blocks[i]) and remaining - marker_tokens - 1 >= MIN_TRUNCATED_TOKENS:
+                    # 章节开头的段落超出剩余预算时截断保留（通常是项目简介），而不是跳过后保留后面的次要内容
+                    texts[i] = self.counter.truncate(blocks[i], remaining - marker_tokens - 1) + TRUNCATED_MARKER
+                    selected.add(i)
+                    remaining = 0
+                elif not selected:
+                    # 第一段就超出预算时截断保留
+                    return self.counter.truncate(blocks[i], self.token_budget) + TRUNCATED_MARKER
+        # 去掉没有保留任何正文的章节标题（后面紧跟同级或更高级标题，或位于末尾）
+        kept = sorted(selected)
+        result = [i for pos, i in enumerate(kept) if not is_heading(blocks[i]) or section_has_content(blocks, kept[pos:])]
+        return "\n\n".join(texts[i] for i in result)
+
+    @property
+    def tokens_saved(self):
+        return self.stats['raw_tokens'] - self.stats['processed_tokens']
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import os
+import logging
+from collections import namedtuple
+
+import oss2
+
+from oss_client import DEFAULT_POOL_SIZE, get_shared_bucket
+
+logger = logging.getLogger(__name__)
+
+# 对象信息：键、大小（字节）、CRC64校验值（列举时为None）、最后修改时间（Unix时间戳）
+ObjectInfo = namedtuple('ObjectInfo', ['key', 'size', 'crc64', 'last_modified'])
+
+
+class ObjectNotFound(Exception):
+    """对象不存在"""
+
+
+def file_crc64(file_path):
+    """按OSS的算法（CRC64-ECMA）计算本地文件的校验值"""
+    crc = oss2.utils.Crc64()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            crc.update(chunk)
+    return crc.crc
+
+
+class OSSStorage:
+    """基于OSS Bucket的存储"""
+    name = 'oss'
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+    def put(self, key, data, headers=None):
+        """写入bytes内容，headers为附加的HTTP头（如Content-Encoding）"""
+        self.bucket.put_object(key, data, headers=headers)
+
+    def put_file(self, key, file_path, headers=None):
+        self.bucket.put_object_from_file(key, file_path, headers=headers)
+
+    def get(self, key):
+        """读取对象内容（bytes），不存在时抛出ObjectNotFound"""
+        try:
+            return self.bucket.get_object(key).read()
+        except oss2.exceptions.NoSuchKey:
+            raise ObjectNotFound(key)
+
+    def head(self, key):
+        """返回ObjectInfo，不存在时返回None"""
+        try:
+            meta = self.bucket.head_object(key)
+        except oss2.exceptions.NotFound:
+            return None
+        return ObjectInfo(key, meta.content_length, meta.server_crc, meta.last_modified)
+
+    def list(self, prefix=''):
+        """按键的字典序列举前缀下的全部对象"""
+        for obj in oss2.ObjectIterator(self.bucket, prefix=prefix):
+            yield ObjectInfo(obj.key, obj.size, None, obj.last_modified)
+
+
+class LocalStorage:
+    """基于本地目录的存储，对象键中的 / 对应子目录
+
+    与OSSStorage行为一致（包括写入的原子性和CRC64校验值），用于离线运行、压测和OSS不可用时的替代保存；
+    HTTP头没有对应的本地语义，写入时忽略，读取返回的是原始字节（与OSS的 get_object 一致）。
+    """
+    name = 'local'
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        parts = [part for part in key.split('/') if part]
+        if not parts or any(part in ('.', '..') for part in parts):
+            raise ValueError(f"无效的对象键: {key}")
+        return os.path.join(self.root, *parts)
+
+    def _write(self, key, write):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    def put(self, key, data, headers=None):
+        self._write(key, lambda f: f.write(data))
+
+    def put_file(self, key, file_path, headers=None):
+        def copy(f):
+            with open(file_path, 'rb') as src:
+                for chunk in iter(lambda: src.read(1024 * 1024), b''):
+                    f.write(chunk)
+        self._write(key, copy)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+
+    def head(self, key):
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        return ObjectInfo(key, stat.st_size, file_crc64(path), int(stat.st_mtime))
+
+    def list(self, prefix=''):
+        if not os.path.isdir(self.root):
+            return
+        keys = []
+        for directory, _, filenames in os.walk(self.root):
+            relative = os.path.relpath(directory, self.root)
+            for filename in filenames:
+                if filename.endswith('.tmp'):
+                    continue
+                key = filename if relative == '.' else relative.replace(os.sep, '/') + '/' + filename
+                if key.startswith(prefix):
+                    keys.append(key)
+        for key in sorted(keys):
+            stat = os.stat(self._path(key))
+            yield ObjectInfo(key, stat.st_size, None, int(stat.st_mtime))
+
+
+def create_storage(backend, local_dir, access_key_id='', access_key_secret='', endpoint='', bucket_name='',
+                   pool_size=DEFAULT_POOL_SIZE):
+    """按STORAGE_BACKEND创建存储："local" 为本地目录，其他值为OSS（配置不完整时返回None，pool_size为连接池大小）"""
+    if (backend or 'oss').lower() == 'local':
+        return LocalStorage(local_dir)
+    if not all([access_key_id, access_key_secret, endpoint, bucket_name]):
+        return None
+    return OSSStorage(get_shared_bucket(access_key_id, access_key_secret, endpoint, bucket_name, pool_size=pool_size))
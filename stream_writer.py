@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class OrderedJSONLWriter:
+    """按序号顺序追加写入JSONL的输出文件（线程安全）
+
+    记录可以乱序到达：序号连续的记录立即写入并刷新到磁盘，之前的记录未到达时暂存，
+    因此文件内容始终是最终结果的一个有序前缀，下游可以边写边读。
+    """
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.next_index = 0
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, index, record):
+        with self.lock:
+            if index < self.next_index or index in self.pending:
+                return
+            self.pending[index] = record
+            lines = []
+            while self.next_index in self.pending:
+                lines.append(json.dumps(self.pending.pop(self.next_index), ensure_ascii=False) + '\n')
+                self.next_index += 1
+            if lines:
+                self.file.write(''.join(lines))
+                self.file.flush()
+
+    @property
+    def count(self):
+        """已写入文件的记录数"""
+        return self.next_index
+
+    def close(self):
+        with self.lock:
+            if self.pending:
+                logger.warning(f"{self.path} 有 {len(self.pending)} 条记录因前序记录缺失未写入")
+            self.file.close()
+
+
+def jsonl_to_json(jsonl_path, json_path, encoding='utf_8_sig'):
+    """逐行读取JSONL生成与 json.dump(..., indent=2) 格式一致的JSON数组文件，不在内存中保存全部记录"""
+    tmp_path = json_path + '.tmp'
+    count = 0
+    with open(jsonl_path, 'r', encoding='utf-8') as src, open(tmp_path, 'w', encoding=encoding) as dst:
+        for line in src:
+            if not line.strip():
+                continue
+            item = json.dumps(json.loads(line), ensure_ascii=False, indent=2)
+            dst.write(('[\n' if count == 0 else ',\n') + '\n'.join('  ' + item_line for item_line in item.split('\n')))
+            count += 1
+        dst.write('\n]' if count else '[]')
+    os.replace(tmp_path, json_path)
+    return count
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""README预处理的回归检查：python test_readme_preprocess.py（也可用 pytest 运行）"""
+from readme_preprocess import ReadmePreprocessor, TRUNCATED_MARKER
+
+BUDGET = 500
+# 约 2000 token 的项目简介段落，远超预算
+DESCRIPTION = ' '.join(f"word{i} is part of the project description" for i in range(400))
+
+
+def test_long_first_paragraph_is_truncated_not_dropped():
+    preprocessor = ReadmePreprocessor(BUDGET)
+    result = preprocessor.process('# MyProj\n\n' + DESCRIPTION)
+    assert result.startswith('# MyProj\n\nword0 is part of the project description')
+    assert result.endswith(TRUNCATED_MARKER)
+    assert preprocessor.counter.count(result) <= BUDGET
+
+
+def test_description_kept_before_later_sections():
+    preprocessor = ReadmePreprocessor(BUDGET)
+    result = preprocessor.process('# MyProj\n\n' + DESCRIPTION + '\n\n## Install\n\npip install myproj')
+    assert 'word0 is part of the project description' in result
+    assert preprocessor.counter.count(result) <= BUDGET
+
+
+def test_short_readme_is_unchanged():
+    preprocessor = ReadmePreprocessor(BUDGET)
+    readme = '# MyProj\n\nA small tool.\n\n## Install\n\npip install myproj'
+    assert preprocessor.process(readme) == readme
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -3,14 +3,44 @@ import os
 import oss2
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from oss_multipart import MultipartUploader
+from oss_retry import RetryPolicy, is_retryable_error, DEFAULT_MAX_ATTEMPTS, DEFAULT_BASE_DELAY, DEFAULT_BUDGET
+from storage import OSSStorage, create_storage, file_crc64
+from oss_client import pool_size_for
+
 OSS_ACCESS_KEY_ID = ""
 OSS_ACCESS_KEY_SECRET = ""
 OSS_ENDPOINT = ""
 OSS_BUCKET_NAME = ""
 OSS_FILE_PATH = ""
 PROJECT_TAG = "all"
+# 存储后端："oss" 上传到OSS，"local" 写入本地目录（离线运行和压测）
+STORAGE_BACKEND = "oss"
+LOCAL_STORAGE_DIR = "oss_upload_simulator"
+# 文件大小达到该值（MB）时改用可断点续传的分片上传
+MULTIPART_THRESHOLD_MB = 20
+# 分片大小（MB）
+MULTIPART_PART_SIZE_MB = 5
+# 并发上传的分片数
+MULTIPART_THREADS = 4
+# 分片上传的本地断点目录
+MULTIPART_CHECKPOINT_DIR = ".oss_upload_checkpoints"
+# OSS中已有内容相同（CRC64一致）的文件时跳过上传
+SKIP_UNCHANGED_UPLOADS = True
+# OSS连接池大小，0表示按默认并发上传数 × MULTIPART_THREADS 自动计算
+OSS_POOL_SIZE = 0
+# upload_files 的默认并发上传数
+DEFAULT_UPLOAD_CONCURRENCY = 4
+# 上传重试：最多尝试次数、指数退避的基础等待时间（秒）、一次上传所有重试的总等待预算（秒）
+OSS_RETRY_MAX_ATTEMPTS = DEFAULT_MAX_ATTEMPTS
+OSS_RETRY_BASE_DELAY = DEFAULT_BASE_DELAY
+OSS_RETRY_BUDGET = DEFAULT_BUDGET
+
+class OSSConfigError(Exception):
+    """OSS上传配置缺失或无法读取"""
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,6 +58,17 @@ class OSSUploader:
             self.OSS_BUCKET_NAME = getattr(config, 'OSS_BUCKET_NAME', '')
             self.OSS_FILE_PATH = getattr(config, 'OSS_FILE_PATH', '')
             self.PROJECT_TAG = getattr(config, 'PROJECT_TAG', '')
+            self.STORAGE_BACKEND = getattr(config, 'STORAGE_BACKEND', STORAGE_BACKEND)
+            self.LOCAL_STORAGE_DIR = getattr(config, 'LOCAL_STORAGE_DIR', LOCAL_STORAGE_DIR)
+            self.MULTIPART_THRESHOLD_MB = getattr(config, 'MULTIPART_THRESHOLD_MB', MULTIPART_THRESHOLD_MB)
+            self.MULTIPART_PART_SIZE_MB = getattr(config, 'MULTIPART_PART_SIZE_MB', MULTIPART_PART_SIZE_MB)
+            self.MULTIPART_THREADS = getattr(config, 'MULTIPART_THREADS', MULTIPART_THREADS)
+            self.MULTIPART_CHECKPOINT_DIR = getattr(config, 'MULTIPART_CHECKPOINT_DIR', MULTIPART_CHECKPOINT_DIR)
+            self.SKIP_UNCHANGED_UPLOADS = getattr(config, 'SKIP_UNCHANGED_UPLOADS', SKIP_UNCHANGED_UPLOADS)
+            self.OSS_POOL_SIZE = getattr(config, 'OSS_POOL_SIZE', OSS_POOL_SIZE)
+            self.OSS_RETRY_MAX_ATTEMPTS = getattr(config, 'OSS_RETRY_MAX_ATTEMPTS', OSS_RETRY_MAX_ATTEMPTS)
+            self.OSS_RETRY_BASE_DELAY = getattr(config, 'OSS_RETRY_BASE_DELAY', OSS_RETRY_BASE_DELAY)
+            self.OSS_RETRY_BUDGET = getattr(config, 'OSS_RETRY_BUDGET', OSS_RETRY_BUDGET)
             logger.info("成功从配置文件读取OSS配置")
         except ImportError:
             logger.info("未找到配置文件，将从环境变量读取配置")
@@ -37,27 +78,64 @@ class OSSUploader:
             self.OSS_BUCKET_NAME = os.environ.get('OSS_BUCKET_NAME', OSS_BUCKET_NAME)
             self.OSS_FILE_PATH = os.environ.get('OSS_FILE_PATH', OSS_FILE_PATH)
             self.PROJECT_TAG = os.environ.get('PROJECT_TAG', PROJECT_TAG)
+            self.STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', STORAGE_BACKEND)
+            self.LOCAL_STORAGE_DIR = os.environ.get('LOCAL_STORAGE_DIR', LOCAL_STORAGE_DIR)
+            try:
+                self.MULTIPART_THRESHOLD_MB = float(os.environ.get('MULTIPART_THRESHOLD_MB', MULTIPART_THRESHOLD_MB))
+                self.MULTIPART_PART_SIZE_MB = float(os.environ.get('MULTIPART_PART_SIZE_MB', MULTIPART_PART_SIZE_MB))
+                self.MULTIPART_THREADS = int(os.environ.get('MULTIPART_THREADS', MULTIPART_THREADS))
+            except ValueError:
+                logger.warning("环境变量中分片上传配置格式不正确，使用默认值")
+                self.MULTIPART_THRESHOLD_MB = MULTIPART_THRESHOLD_MB
+                self.MULTIPART_PART_SIZE_MB = MULTIPART_PART_SIZE_MB
+                self.MULTIPART_THREADS = MULTIPART_THREADS
+            self.MULTIPART_CHECKPOINT_DIR = os.environ.get('MULTIPART_CHECKPOINT_DIR', MULTIPART_CHECKPOINT_DIR)
+            self.SKIP_UNCHANGED_UPLOADS = os.environ.get('SKIP_UNCHANGED_UPLOADS', 'true').lower() in ('true', '1', 'yes')
+            try:
+                self.OSS_POOL_SIZE = int(os.environ.get('OSS_POOL_SIZE', OSS_POOL_SIZE))
+            except ValueError:
+                logger.warning("环境变量中OSS_POOL_SIZE格式不正确，使用默认值")
+                self.OSS_POOL_SIZE = OSS_POOL_SIZE
+            try:
+                self.OSS_RETRY_MAX_ATTEMPTS = int(os.environ.get('OSS_RETRY_MAX_ATTEMPTS', OSS_RETRY_MAX_ATTEMPTS))
+                self.OSS_RETRY_BASE_DELAY = float(os.environ.get('OSS_RETRY_BASE_DELAY', OSS_RETRY_BASE_DELAY))
+                self.OSS_RETRY_BUDGET = float(os.environ.get('OSS_RETRY_BUDGET', OSS_RETRY_BUDGET))
+            except ValueError:
+                logger.warning("环境变量中OSS重试配置格式不正确，使用默认值")
+                self.OSS_RETRY_MAX_ATTEMPTS = OSS_RETRY_MAX_ATTEMPTS
+                self.OSS_RETRY_BASE_DELAY = OSS_RETRY_BASE_DELAY
+                self.OSS_RETRY_BUDGET = OSS_RETRY_BUDGET
         except Exception as e:
             logger.error(f"读取配置文件失败: {e}")
             logger.info("请确保正确的OSS配置")
-            sys.exit(1)
+            raise OSSConfigError(f"读取配置文件失败: {e}")
         
         # 检查配置是否完整
         self._check_config()
+        
+        # 未指定时按配置创建存储（见 get_storage），调用方也可以直接传入
+        self.storage = None
+        
+        # 同一个上传器的所有重试共享一个重试预算
+        self.retry_policy = RetryPolicy(max_attempts=self.OSS_RETRY_MAX_ATTEMPTS,
+                                        base_delay=self.OSS_RETRY_BASE_DELAY,
+                                        budget=self.OSS_RETRY_BUDGET)
     
     def _check_config(self):
-        """检查OSS配置是否完整"""
+        """检查OSS配置是否完整，不完整时抛出OSSConfigError"""
         missing_configs = []
-        if not self.OSS_ACCESS_KEY_ID: missing_configs.append('OSS_ACCESS_KEY_ID')
-        if not self.OSS_ACCESS_KEY_SECRET: missing_configs.append('OSS_ACCESS_KEY_SECRET')
-        if not self.OSS_ENDPOINT: missing_configs.append('OSS_ENDPOINT')
-        if not self.OSS_BUCKET_NAME: missing_configs.append('OSS_BUCKET_NAME')
-        if not self.OSS_FILE_PATH: missing_configs.append('OSS_FILE_PATH')
+        # 本地存储后端不需要OSS凭证，存储目录前缀也可以为空
+        if self.STORAGE_BACKEND.lower() != 'local':
+            if not self.OSS_ACCESS_KEY_ID: missing_configs.append('OSS_ACCESS_KEY_ID')
+            if not self.OSS_ACCESS_KEY_SECRET: missing_configs.append('OSS_ACCESS_KEY_SECRET')
+            if not self.OSS_ENDPOINT: missing_configs.append('OSS_ENDPOINT')
+            if not self.OSS_BUCKET_NAME: missing_configs.append('OSS_BUCKET_NAME')
+            if not self.OSS_FILE_PATH: missing_configs.append('OSS_FILE_PATH')
         if not self.PROJECT_TAG: missing_configs.append('PROJECT_TAG')
         
         if missing_configs:
             logger.error(f"OSS配置不完整，缺少: {', '.join(missing_configs)}")
-            sys.exit(1)
+            raise OSSConfigError(f"OSS配置不完整，缺少: {', '.join(missing_configs)}")
     
     def get_data_file(self):
         """查找要上传的数据文件（优先JSON，后CSV）"""
@@ -100,93 +178,141 @@ class OSSUploader:
         """查找要上传的CSV文件（向后兼容）"""
         return self.get_data_file()
     
-    def upload_file_to_oss(self, file_path, oss_file_path=None):
-        """上传文件到OSS，增加重试逻辑"""
+    def get_storage(self):
+        """获取上传目标存储，OSS后端复用进程内共享的Bucket连接池，配置不完整时返回None"""
+        if self.storage is None:
+            pool_size = self.OSS_POOL_SIZE or pool_size_for(DEFAULT_UPLOAD_CONCURRENCY, self.MULTIPART_THREADS)
+            self.storage = create_storage(self.STORAGE_BACKEND, self.LOCAL_STORAGE_DIR,
+                                          self.OSS_ACCESS_KEY_ID, self.OSS_ACCESS_KEY_SECRET,
+                                          self.OSS_ENDPOINT, self.OSS_BUCKET_NAME, pool_size=pool_size)
+        return self.storage
+    
+    def _is_unchanged(self, storage, file_path, oss_file_path):
+        """存储中已存在内容相同的文件时返回True（分片上传的文件同样带有CRC64，无法比较时按有变化处理）"""
+        if not self.SKIP_UNCHANGED_UPLOADS:
+            return False
+        try:
+            info = storage.head(oss_file_path)
+        except Exception as e:
+            logger.warning(f"查询OSS文件信息失败，将直接上传: {e}")
+            return False
+        if info is None or info.crc64 is None or info.size != os.path.getsize(file_path):
+            return False
+        return file_crc64(file_path) == info.crc64
+    
+    def _multipart_uploader(self, storage, file_path):
+        """OSS上超过分片阈值的大文件返回分片上传器，否则返回None"""
+        try:
+            if not isinstance(storage, OSSStorage) or os.path.getsize(file_path) < self.MULTIPART_THRESHOLD_MB * 1024 * 1024:
+                return None
+        except OSError:
+            return None
+        return MultipartUploader(storage.bucket, self.MULTIPART_CHECKPOINT_DIR,
+                                 int(self.MULTIPART_PART_SIZE_MB * 1024 * 1024), self.MULTIPART_THREADS)
+    
+    def _put_file(self, storage, file_path, oss_file_path, headers=None):
+        """上传单个文件：OSS上超过分片阈值的大文件使用可断点续传的分片上传，重试时只上传未完成的分片"""
+        uploader = self._multipart_uploader(storage, file_path)
+        if uploader is not None:
+            uploader.upload(oss_file_path, file_path, headers=headers)
+        else:
+            storage.put_file(oss_file_path, file_path, headers=headers)
+    
+    def _abandon_upload(self, file_path, oss_file_path):
+        """重试用完后放弃上传：取消未完成的分片上传任务（文件名带日期，不会再续传，留下的分片会一直计费）"""
+        try:
+            uploader = self._multipart_uploader(self.get_storage(), file_path)
+        except Exception as e:
+            logger.warning(f"无法取消未完成的分片上传: {e}")
+            return
+        if uploader is not None:
+            uploader.abort(oss_file_path, file_path)
+    
+    def upload_file_to_oss(self, file_path, oss_file_path=None, headers=None):
+        """上传文件到OSS，增加重试逻辑（headers为附加的HTTP头，如压缩文件的Content-Encoding），返回是否成功"""
+        return self.upload_file(file_path, oss_file_path, headers=headers)['success']
+    
+    def upload_file(self, file_path, oss_file_path=None, headers=None):
+        """上传单个文件（带重试），返回与 upload_files 中每项格式一致的结果"""
         if not oss_file_path:
             # 如果未提供OSS文件路径，构建默认路径
             oss_directory = self.OSS_FILE_PATH.rstrip('/') + '/' if self.OSS_FILE_PATH else ''
             oss_file_path = oss_directory + os.path.basename(file_path)
         
-        # 设置重试次数和间隔
-        max_retries = 3  # 重试次数
-        retry_interval = 5  # 秒
+        policy = self.retry_policy
+        result = {'local_path': file_path, 'oss_file_path': oss_file_path, 'success': False, 'skipped': False,
+                  'attempts': 0, 'seconds': 0.0, 'error': None}
+        start = time.time()
         
         # 尝试上传文件
-        for attempt in range(max_retries):
+        attempt = 0
+        while True:
+            attempt += 1
+            result['attempts'] = attempt
             try:
-                # 创建OSS认证对象
-                auth = oss2.Auth(self.OSS_ACCESS_KEY_ID, self.OSS_ACCESS_KEY_SECRET)
-                if attempt == 0:
-                    logger.info("创建OSS认证对象成功")
+                # 复用进程内共享的OSS Bucket，连接池和超时在创建时统一设置，重试时不再重新建立连接
+                storage = self.get_storage()
                 
-                # 创建OSS Bucket对象
-                bucket = oss2.Bucket(auth, self.OSS_ENDPOINT, self.OSS_BUCKET_NAME)
-                if attempt == 0:
-                    logger.info(f"创建OSS Bucket对象成功，Bucket: {self.OSS_BUCKET_NAME}")
+                if self._is_unchanged(storage, file_path, oss_file_path):
+                    logger.info(f"✅ OSS中的 {oss_file_path} 与本地文件内容相同，跳过上传")
+                    result.update(success=True, skipped=True, seconds=time.time() - start)
+                    return result
                 
-                # 设置连接超时和重试策略
-                oss2.defaults.connect_timeout = 60  # 60秒连接超时
-                oss2.defaults.socket_timeout = 60   # 60秒套接字超时
+                # 上传文件（失败时抛出异常）
+                logger.info(f"开始上传文件到OSS: {oss_file_path} (尝试 {attempt}/{policy.max_attempts})...")
+                self._put_file(storage, file_path, oss_file_path, headers=headers)
                 
-                # 上传文件
-                logger.info(f"开始上传文件到OSS: {oss_file_path} (尝试 {attempt+1}/{max_retries})...")
-                result = bucket.put_object_from_file(oss_file_path, file_path)
-                
-                if result.status == 200:
-                    logger.info(f"✅ 文件上传成功！")
-                    logger.info(f"- 本地文件: {file_path}")
-                    logger.info(f"- OSS路径: {oss_file_path}")
+                logger.info(f"✅ 文件上传成功！")
+                logger.info(f"- 本地文件: {file_path}")
+                logger.info(f"- OSS路径: {oss_file_path}")
+                if storage.name == 'local':
+                    logger.info(f"- 本地存储目录: {self.LOCAL_STORAGE_DIR}")
+                else:
                     logger.info(f"- OSS Bucket: {self.OSS_BUCKET_NAME}")
                     logger.info(f"- OSS Endpoint: {self.OSS_ENDPOINT}")
-                    return True
-                else:
-                    logger.error(f"文件上传失败，HTTP状态码: {result.status}")
-                    if attempt < max_retries - 1:
-                        logger.info(f"{retry_interval}秒后重试...")
-                        time.sleep(retry_interval)
-                    else:
-                        break
+                result.update(success=True, seconds=time.time() - start)
+                return result
             except oss2.exceptions.NoSuchBucket as e:
+                result['error'] = f"{type(e).__name__}: {e}"
                 logger.error(f"Bucket不存在: {self.OSS_BUCKET_NAME}")
                 logger.info("请确认Bucket名称是否正确，以及是否已在阿里云OSS控制台创建")
-                break
-            except oss2.exceptions.NoSuchKey as e:
-                logger.error(f"文件不存在或访问权限不足")
-                break
+                retryable = False
             except oss2.exceptions.AccessDenied as e:
+                result['error'] = f"{type(e).__name__}: {e}"
                 logger.error(f"访问被拒绝，可能是Access Key ID或Access Key Secret不正确")
                 logger.info("请确认OSS访问凭证是否正确，并具有足够的权限")
-                break
+                retryable = False
             except oss2.exceptions.ServerError as e:
+                result['error'] = f"{type(e).__name__}: {e}"
                 logger.error(f"OSS服务器错误: {e}")
-                if hasattr(e, 'status') and e.status == 502:
+                if e.status == 502:
                     logger.info("502错误可能是网络问题、OSS端点配置错误或Bucket不在指定区域")
                     logger.info("请检查:")
                     logger.info(f"1. 网络连接是否正常")
                     logger.info(f"2. OSS_ENDPOINT是否正确(当前: {self.OSS_ENDPOINT})")
                     logger.info(f"3. Bucket '{self.OSS_BUCKET_NAME}'是否在指定的区域")
-                if attempt < max_retries - 1:
-                    logger.info(f"{retry_interval}秒后重试...")
-                    time.sleep(retry_interval)
-                else:
-                    break
+                retryable = is_retryable_error(e)
             except oss2.exceptions.RequestError as e:
+                result['error'] = f"{type(e).__name__}: {e}"
                 logger.error(f"请求错误: {e}")
                 logger.info("可能是网络连接问题或OSS端点配置错误")
-                if attempt < max_retries - 1:
-                    logger.info(f"{retry_interval}秒后重试...")
-                    time.sleep(retry_interval)
-                else:
-                    break
+                retryable = True
             except Exception as e:
+                result['error'] = f"{type(e).__name__}: {e}"
                 logger.error(f"上传文件时发生未知错误: {e}")
                 import traceback
                 traceback.print_exc()
-                if attempt < max_retries - 1:
-                    logger.info(f"{retry_interval}秒后重试...")
-                    time.sleep(retry_interval)
-                else:
-                    break
+                retryable = is_retryable_error(e)
+            
+            if not retryable:
+                logger.error("该错误重试也不会成功，放弃上传")
+                break
+            delay = policy.next_delay(attempt)
+            if delay is None:
+                self._abandon_upload(file_path, oss_file_path)
+                break
+            logger.info(f"{delay:.1f}秒后重试...")
+            time.sleep(delay)
         
         # 提供手动上传的建议
         logger.info("\n如果自动上传失败，您可以尝试手动上传:")
@@ -195,9 +321,75 @@ class OSSUploader:
         logger.info(f"3. 进入目录: {self.OSS_FILE_PATH or '根目录'}")
         logger.info(f"4. 上传文件: {file_path}")
         
-        return False
+        result['seconds'] = time.time() - start
+        return result
+    
+    def _upload_once(self, file_path, oss_file_path, headers=None):
+        """上传单个文件一次（不重试），返回 (是否成功, 是否因内容未变化跳过, 是否值得重试, 错误信息)"""
+        try:
+            storage = self.get_storage()
+            if self._is_unchanged(storage, file_path, oss_file_path):
+                return True, True, False, None
+            self._put_file(storage, file_path, oss_file_path, headers=headers)
+            return True, False, False, None
+        except Exception as e:
+            return False, False, is_retryable_error(e), f"{type(e).__name__}: {e}"
+    
+    def upload_files(self, files, max_workers=DEFAULT_UPLOAD_CONCURRENCY):
+        """并发上传多个文件，只重试失败且值得重试的文件（按 retry_policy 退避）
+        
+        files 为 (本地路径, OSS路径) 或 (本地路径, OSS路径, HTTP头) 的列表；
+        返回与 files 顺序一致的结果列表，每项包含 local_path、oss_file_path、success、skipped（内容未变化未上传）、attempts、seconds、error。
+        """
+        results = [
+            {'local_path': item[0], 'oss_file_path': item[1], 'success': False, 'skipped': False,
+             'attempts': 0, 'seconds': 0.0, 'error': None}
+            for item in files
+        ]
+        
+        def upload(index):
+            """上传一次，返回失败后是否值得重试"""
+            result = results[index]
+            headers = files[index][2] if len(files[index]) > 2 else None
+            start = time.time()
+            success, skipped, retryable, error = self._upload_once(result['local_path'], result['oss_file_path'], headers)
+            result['attempts'] += 1
+            result['seconds'] = time.time() - start
+            result['success'] = success
+            result['skipped'] = skipped
+            result['error'] = error
+            return retryable
+        
+        policy = self.retry_policy
+        pending = list(range(len(files)))
+        attempt = 0
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(files) or 1))) as executor:
+            while pending:
+                attempt += 1
+                logger.info(f"开始并发上传 {len(pending)} 个文件到OSS...")
+                retryable = list(executor.map(upload, pending))
+                pending = [index for index, can_retry in zip(pending, retryable) if not results[index]['success'] and can_retry]
+                if not pending:
+                    break
+                delay = policy.next_delay(attempt)
+                if delay is None:
+                    for index in pending:
+                        self._abandon_upload(results[index]['local_path'], results[index]['oss_file_path'])
+                    break
+                logger.info(f"{len(pending)} 个文件上传失败，{delay:.1f}秒后重试 (第 {attempt+1}/{policy.max_attempts} 轮)...")
+                time.sleep(delay)
+        
+        for result in results:
+            if result['skipped']:
+                logger.info(f"✅ {result['local_path']} -> {result['oss_file_path']}（内容未变化，跳过上传）")
+            elif result['success']:
+                logger.info(f"✅ {result['local_path']} -> {result['oss_file_path']}（{result['seconds']:.2f} 秒）")
+            else:
+                logger.error(f"❌ {result['local_path']} -> {result['oss_file_path']} 上传失败"
+                             f"（尝试 {result['attempts']} 次）: {result['error']}")
+        return results
     
-    def upload_data(self, filename=None):
+    def upload_data(self, filename=None, headers=None):
         """上传数据文件到OSS，如未指定文件名则自动查找"""
         # 如果未指定文件名，自动查找
         if not filename:
@@ -210,11 +402,14 @@ class OSSUploader:
         oss_file_path = oss_directory + os.path.basename(filename)
         
         # 上传文件
-        return self.upload_file_to_oss(filename, oss_file_path)
+        return self.upload_file_to_oss(filename, oss_file_path, headers=headers)
 
 # 提供便捷的函数供外部调用
-def upload_to_oss(filename=None, access_key_id=None, access_key_secret=None, endpoint=None, bucket_name=None, oss_file_path=None):
-    """便捷的上传函数，可直接调用或通过参数覆盖配置"""
+def upload_to_oss(filename=None, access_key_id=None, access_key_secret=None, endpoint=None, bucket_name=None, oss_file_path=None, headers=None, storage=None, return_result=False):
+    """便捷的上传函数，可直接调用或通过参数覆盖配置（storage为上传目标存储，默认按配置创建）
+
+    默认返回是否成功；return_result为True时（需指定filename）返回与 upload_files_to_oss 中每项格式一致的结果（包含是否因内容未变化跳过）。
+    """
     # 创建上传器实例
     uploader = OSSUploader()
     
@@ -223,20 +418,40 @@ def upload_to_oss(filename=None, access_key_id=None, access_key_secret=None, end
     if access_key_secret: uploader.OSS_ACCESS_KEY_SECRET = access_key_secret
     if endpoint: uploader.OSS_ENDPOINT = endpoint
     if bucket_name: uploader.OSS_BUCKET_NAME = bucket_name
+    if storage: uploader.storage = storage
     if oss_file_path:
         # 从路径中提取目录和文件名
         uploader.OSS_FILE_PATH = os.path.dirname(oss_file_path)
-        return uploader.upload_file_to_oss(filename, oss_file_path)
+    if return_result:
+        return uploader.upload_file(filename, oss_file_path, headers=headers)
+    if oss_file_path:
+        return uploader.upload_file_to_oss(filename, oss_file_path, headers=headers)
     
     # 调用上传数据方法
-    return uploader.upload_data(filename)
+    return uploader.upload_data(filename, headers=headers)
+
+def upload_files_to_oss(files, access_key_id=None, access_key_secret=None, endpoint=None, bucket_name=None, max_workers=4, storage=None):
+    """便捷的批量上传函数，files 为 (本地路径, OSS路径[, HTTP头]) 的列表，返回每个文件的上传结果"""
+    uploader = OSSUploader()
+    
+    # 如果提供了参数，覆盖配置
+    if access_key_id: uploader.OSS_ACCESS_KEY_ID = access_key_id
+    if access_key_secret: uploader.OSS_ACCESS_KEY_SECRET = access_key_secret
+    if endpoint: uploader.OSS_ENDPOINT = endpoint
+    if bucket_name: uploader.OSS_BUCKET_NAME = bucket_name
+    if storage: uploader.storage = storage
+    
+    return uploader.upload_files(files, max_workers=max_workers)
 
 def main():
     """主函数，用于直接运行脚本"""
     logger.info("===== OSS上传工具 ======")
     
     # 创建OSSUploader实例
-    oss_uploader = OSSUploader()
+    try:
+        oss_uploader = OSSUploader()
+    except OSSConfigError:
+        sys.exit(1)
     
     # 查找今天的数据文件
     data_file = oss_uploader.get_data_file()